@@ -2,7 +2,8 @@
 Book parser module for reading book titles from files.
 """
 import csv
-from typing import List, Tuple, Optional
+import io
+from typing import Iterable, List, Tuple, Optional
 
 
 def _is_csv_file(file_path: str) -> bool:
@@ -53,44 +54,75 @@ def parse_csv_file(file_path: str) -> List[Tuple[str, Optional[str]]]:
         UnicodeDecodeError: If the file encoding is invalid
         ValueError: If CSV has no title column
     """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return _parse_csv_lines(f)
+
+
+def _parse_csv_lines(lines: Iterable[str]) -> List[Tuple[str, Optional[str]]]:
+    """Parse CSV rows from an iterable of text lines (open file or StringIO)."""
     title_synonyms = ['title', 'name', 'book', 'book title', 'book name']
     author_synonyms = ['author', 'writer', 'by', 'author name', 'written by']
 
     books = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-
-        # Read header row
-        try:
-            headers = next(reader)
-        except StopIteration:
-            # Empty file
-            return books
-
-        # Find title and author columns
-        title_idx = _find_column_index(headers, title_synonyms)
-        author_idx = _find_column_index(headers, author_synonyms)
-
-        if title_idx is None:
-            raise ValueError("CSV file must have a column with title information "
-                           "(acceptable headers: title, name, book, etc.)")
-
-        # Read data rows
-        for row in reader:
-            if not row or len(row) <= title_idx:
-                continue
-
-            title = row[title_idx].strip()
-            if not title:
-                continue
-
-            author = None
-            if author_idx is not None and len(row) > author_idx:
-                author = row[author_idx].strip()
-                if not author:
-                    author = None
+    reader = csv.reader(lines)
+
+    # Read header row
+    try:
+        headers = next(reader)
+    except StopIteration:
+        # Empty file
+        return books
+
+    # Find title and author columns
+    title_idx = _find_column_index(headers, title_synonyms)
+    author_idx = _find_column_index(headers, author_synonyms)
+
+    if title_idx is None:
+        raise ValueError("CSV file must have a column with title information "
+                       "(acceptable headers: title, name, book, etc.)")
+
+    # Read data rows
+    for row in reader:
+        if not row or len(row) <= title_idx:
+            continue
 
+        title = row[title_idx].strip()
+        if not title:
+            continue
+
+        author = None
+        if author_idx is not None and len(row) > author_idx:
+            author = row[author_idx].strip()
+            if not author:
+                author = None
+
+        books.append((title, author))
+
+    return books
+
+
+def _parse_text_lines(lines: Iterable[str]) -> List[Tuple[str, Optional[str]]]:
+    """Parse 'Title by Author' / 'Title - Author' / 'Title' lines."""
+    books = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):  # Skip empty lines and comments
+            continue
+        # Try to parse "Title by Author" format
+        if ' by ' in line:
+            parts = line.split(' by ', 1)
+            title = parts[0].strip()
+            author = parts[1].strip()
             books.append((title, author))
+        # Try to parse "Title - Author" format
+        elif ' - ' in line:
+            parts = line.split(' - ', 1)
+            title = parts[0].strip()
+            author = parts[1].strip()
+            books.append((title, author))
+        else:
+            # No author specified
+            books.append((line.strip(), None))
 
     return books
 
@@ -126,26 +158,29 @@ def parse_book_file(file_path: str) -> List[Tuple[str, Optional[str]]]:
     if _is_csv_file(file_path):
         return parse_csv_file(file_path)
 
-    books = []
     with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):  # Skip empty lines and comments
-                continue
-            # Try to parse "Title by Author" format
-            if ' by ' in line:
-                parts = line.split(' by ', 1)
-                title = parts[0].strip()
-                author = parts[1].strip()
-                books.append((title, author))
-            # Try to parse "Title - Author" format
-            elif ' - ' in line:
-                parts = line.split(' - ', 1)
-                title = parts[0].strip()
-                author = parts[1].strip()
-                books.append((title, author))
-            else:
-                # No author specified
-                books.append((line.strip(), None))
+        return _parse_text_lines(f)
 
-    return books
+
+def parse_book_content(content: str, filename: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Parse already-decoded book file content without touching the filesystem.
+
+    Accepts the same formats as parse_book_file; the format is chosen from
+    the filename's extension.
+
+    Args:
+        content: Decoded text content of the file
+        filename: Original filename, used only to detect CSV
+
+    Returns:
+        List of tuples (title, author or None)
+
+    Raises:
+        ValueError: If CSV content has no title column
+    """
+    # newline=None gives the same universal-newline handling as open()
+    stream = io.StringIO(content, newline=None)
+    if _is_csv_file(filename):
+        return _parse_csv_lines(stream)
+    return _parse_text_lines(stream)
@@ -14,6 +14,7 @@ from book_parser import parse_book_file
 from validation import (
     validate_all_book_data,
     validate_file_path,
+    validate_summary,
     ValidationError
 )
 
@@ -1082,7 +1083,6 @@ that they have read on their bookshelf.
             new_summary = summary_text.get("1.0", tk.END).strip()
 
             try:
-                from validation import validate_summary
                 validated_summary = validate_summary(new_summary) if new_summary else None
                 self.db.update_summary(book['id'], validated_summary)
                 self._refresh_book_list()
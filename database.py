@@ -2,14 +2,38 @@
 Database module for storing book information and summaries.
 """
 import sqlite3
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from validation import (
     validate_all_book_data,
     validate_book_id,
+    validate_summary,
     ValidationError
 )
 from models import User
 
+# SQL used on the add_book hot path. Keeping these as module-level constants
+# guarantees byte-identical statement text, so sqlite3's per-connection
+# statement cache reuses the compiled statement instead of re-preparing it.
+_SELECT_BOOK_NO_USER_SQL = "SELECT id FROM books WHERE title = ? AND author = ? AND user_id IS NULL"
+_SELECT_BOOK_FOR_USER_SQL = "SELECT id FROM books WHERE title = ? AND author = ? AND user_id = ?"
+_INSERT_BOOK_SQL = "INSERT INTO books (title, author, summary, user_id) VALUES (?, ?, ?, ?)"
+# Duplicates hit UNIQUE(title, author) and are skipped instead of raising
+_INSERT_BOOK_OR_IGNORE_SQL = (
+    "INSERT OR IGNORE INTO books (title, author, summary, user_id) VALUES (?, ?, NULL, ?)"
+)
+
+# book_versions owners for books without a user and for all books
+_UNOWNED_BOOKS_OWNER = 0
+_ALL_BOOKS_OWNER = -1
+
+# IDs per "WHERE id IN (...)" query, well under SQLite's host parameter limit
+_MAX_IDS_PER_QUERY = 500
+
+# Connection tuning applied in BookDatabase._configure_connection():
+# a 64 MiB page cache and a 256 MiB memory-mapped read window.
+_CACHE_SIZE_KIB = 64000
+_MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
 
 class BookDatabase:
     """Database handler for bookshelf application."""
@@ -20,7 +44,24 @@ class BookDatabase:
         # check_same_thread=False allows SQLite to be used in multi-threaded Flask app
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self._configure_connection()
         self._create_tables()
+    def _configure_connection(self):
+        """Apply per-connection SQLite tuning.
+
+        WAL lets readers (other workers, the CLI, the GUI) proceed while a
+        write is in progress, and with synchronous=NORMAL a commit no longer
+        fsyncs the main database file. The page cache and mmap window keep
+        the read-heavy book listings out of read() syscalls, and temporary
+        sort b-trees stay in memory. Lock waits use sqlite3.connect's
+        default 5 second busy timeout.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size=-{_CACHE_SIZE_KIB}")
+        cursor.execute(f"PRAGMA mmap_size={_MMAP_SIZE_BYTES}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
     def _create_tables(self):
         """Create necessary database tables with length constraints."""
         cursor = self.conn.cursor()
@@ -60,6 +101,50 @@ class BookDatabase:
         if 'user_id' not in columns:
             cursor.execute("ALTER TABLE books ADD COLUMN user_id INTEGER")
             self.conn.commit()
+        
+        # Case-insensitive indexes so title/author sorts can stream from the
+        # index instead of building a temporary b-tree for every query
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_books_title_nocase ON books(title COLLATE NOCASE)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_books_author_nocase "
+            "ON books(author COLLATE NOCASE, title COLLATE NOCASE)"
+        )
+        # Partial index over books still waiting for a summary, in
+        # get_books_without_summary() order, so that query only visits those rows
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_books_no_summary ON books(created_at) "
+            "WHERE summary IS NULL OR summary = ''"
+        )
+        
+        # Per-owner change counters for cheap "has anything changed?" checks.
+        # owner is the user_id, _UNOWNED_BOOKS_OWNER for books without one,
+        # and _ALL_BOOKS_OWNER counts every change. Triggers keep them in
+        # step with any write to books, including raw SQL.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS book_versions (
+                owner INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        old_owner = f"(COALESCE(OLD.user_id, {_UNOWNED_BOOKS_OWNER}), 1)"
+        new_owner = f"(COALESCE(NEW.user_id, {_UNOWNED_BOOKS_OWNER}), 1)"
+        all_books = f"({_ALL_BOOKS_OWNER}, 1)"
+        for event, rows in (
+            ("INSERT", f"{new_owner}, {all_books}"),
+            ("UPDATE", f"{old_owner}, {new_owner}, {all_books}"),
+            ("DELETE", f"{old_owner}, {all_books}"),
+        ):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS books_version_after_{event.lower()}
+                AFTER {event} ON books
+                BEGIN
+                    INSERT INTO book_versions (owner, version) VALUES {rows}
+                    ON CONFLICT(owner) DO UPDATE SET version = version + 1;
+                END
+            """)
+        self.conn.commit()
     def add_book(self, title: str, author: str, summary: Optional[str] = None, 
                  user_id: Optional[int] = None) -> int:
         """
@@ -86,14 +171,10 @@ class BookDatabase:
         
         # Check for existing book first (application-level duplicate check)
         if user_id is None:
-            cursor.execute(
-                "SELECT id FROM books WHERE title = ? AND author = ? AND user_id IS NULL",
-                (validated_title, validated_author)
-            )
+            cursor.execute(_SELECT_BOOK_NO_USER_SQL, (validated_title, validated_author))
         else:
             cursor.execute(
-                "SELECT id FROM books WHERE title = ? AND author = ? AND user_id = ?",
-                (validated_title, validated_author, user_id)
+                _SELECT_BOOK_FOR_USER_SQL, (validated_title, validated_author, user_id)
             )
         existing = cursor.fetchone()
         if existing:
@@ -102,7 +183,7 @@ class BookDatabase:
         # Insert new book
         try:
             cursor.execute(
-                "INSERT INTO books (title, author, summary, user_id) VALUES (?, ?, ?, ?)",
+                _INSERT_BOOK_SQL,
                 (validated_title, validated_author, validated_summary, user_id)
             )
             self.conn.commit()
@@ -116,6 +197,33 @@ class BookDatabase:
             )
             result = cursor.fetchone()
             return result['id'] if result else -1
+    def add_books_bulk(self, books: Iterable[Tuple[str, str]],
+                       user_id: Optional[int] = None) -> int:
+        """
+        Add many books in a single transaction.
+
+        Books that already exist are skipped, as with add_book, but all rows
+        are inserted with one executemany and committed once.
+
+        Args:
+            books: (title, author) pairs
+            user_id: User ID who owns these books (optional)
+
+        Returns:
+            Number of books actually inserted
+
+        Raises:
+            ValidationError: If any title or author fails validation; nothing
+                is inserted in that case
+        """
+        rows = []
+        for title, author in books:
+            validated_title, validated_author, _ = validate_all_book_data(title, author, None)
+            rows.append((validated_title, validated_author, user_id))
+        
+        with self.conn:
+            cursor = self.conn.executemany(_INSERT_BOOK_OR_IGNORE_SQL, rows)
+        return cursor.rowcount
     def update_summary(self, book_id: int, summary: str, user_id: Optional[int] = None):
         """
         Update the summary for a book with validation.
@@ -128,8 +236,6 @@ class BookDatabase:
         Raises:
             ValidationError: If input validation fails
         """
-        from validation import validate_summary
-        
         # Validate inputs
         validated_id = validate_book_id(book_id)
         validated_summary = validate_summary(summary)
@@ -177,6 +283,40 @@ class BookDatabase:
             cursor.execute("SELECT * FROM books WHERE id = ?", (validated_id,))
         result = cursor.fetchone()
         return dict(result) if result else None
+    def get_books_by_ids(self, book_ids: Iterable[int],
+                         user_id: Optional[int] = None) -> Dict[int, dict]:
+        """
+        Get several books by ID with one query per batch of IDs.
+        
+        Args:
+            book_ids: Book IDs to retrieve
+            user_id: User ID (optional, for authorization check)
+            
+        Returns:
+            Dictionary mapping book ID to book dictionary; IDs that are not
+            found (or not visible to the user) are missing
+            
+        Raises:
+            ValidationError: If any book_id is invalid
+        """
+        validated_ids = list(dict.fromkeys(validate_book_id(book_id) for book_id in book_ids))
+        
+        books = {}
+        cursor = self.conn.cursor()
+        for start in range(0, len(validated_ids), _MAX_IDS_PER_QUERY):
+            batch = validated_ids[start:start + _MAX_IDS_PER_QUERY]
+            placeholders = ", ".join("?" * len(batch))
+            if user_id is not None:
+                cursor.execute(
+                    f"SELECT * FROM books WHERE id IN ({placeholders}) "
+                    "AND (user_id = ? OR user_id IS NULL)",
+                    (*batch, user_id)
+                )
+            else:
+                cursor.execute(f"SELECT * FROM books WHERE id IN ({placeholders})", batch)
+            for row in cursor.fetchall():
+                books[row['id']] = dict(row)
+        return books
     def get_all_books(self, user_id: Optional[int] = None, sort_by: str = "recent") -> List[dict]:
         """
         Get all books from the database.
@@ -193,11 +333,11 @@ class BookDatabase:
         if sort_by not in valid_sorts:
             sort_by = "recent"
         
-        # Build ORDER BY clause
+        # Build ORDER BY clause (COLLATE NOCASE matches the indexes created above)
         if sort_by == "title":
-            order_clause = "ORDER BY LOWER(title) ASC"
+            order_clause = "ORDER BY title COLLATE NOCASE ASC"
         elif sort_by == "author":
-            order_clause = "ORDER BY LOWER(author) ASC, LOWER(title) ASC"
+            order_clause = "ORDER BY author COLLATE NOCASE ASC, title COLLATE NOCASE ASC"
         else:  # recent
             order_clause = "ORDER BY created_at DESC"
         
@@ -212,6 +352,56 @@ class BookDatabase:
             # No user specified (backwards compatibility)
             cursor.execute(f"SELECT * FROM books {order_clause}")
         return [dict(row) for row in cursor.fetchall()]
+    def get_books_without_summary(self, user_id: Optional[int] = None) -> List[dict]:
+        """
+        Get books that have no summary yet, most recent first.
+        
+        Only id, title and author are fetched, so existing summary text is
+        never read just to be thrown away.
+        
+        Args:
+            user_id: User ID to filter books (optional)
+            
+        Returns:
+            List of book dictionaries with id, title and author
+        """
+        cursor = self.conn.cursor()
+        if user_id is not None:
+            cursor.execute(
+                "SELECT id, title, author FROM books "
+                "WHERE (user_id = ? OR user_id IS NULL) AND (summary IS NULL OR summary = '') "
+                "ORDER BY created_at DESC",
+                (user_id,)
+            )
+        else:
+            cursor.execute(
+                "SELECT id, title, author FROM books "
+                "WHERE summary IS NULL OR summary = '' ORDER BY created_at DESC"
+            )
+        return [dict(row) for row in cursor.fetchall()]
+    def get_books_version(self, user_id: Optional[int] = None) -> str:
+        """
+        Get a token that changes whenever the books visible to a user change.
+        
+        Args:
+            user_id: User ID whose view of the books to describe (optional;
+                None covers every book, matching get_all_books)
+            
+        Returns:
+            Opaque version string, e.g. for use in an ETag
+        """
+        cursor = self.conn.cursor()
+        owners: Tuple[int, ...]
+        if user_id is not None:
+            owners = (user_id, _UNOWNED_BOOKS_OWNER)
+        else:
+            owners = (_ALL_BOOKS_OWNER,)
+        cursor.execute(
+            f"SELECT owner, version FROM book_versions WHERE owner IN ({', '.join('?' * len(owners))})",
+            owners
+        )
+        versions = dict(cursor.fetchall())
+        return "-".join(str(versions.get(owner, 0)) for owner in owners)
     def search_books_by_title(self, title: str) -> List[dict]:
         """Search for books by title."""
         cursor = self.conn.cursor()
@@ -2,11 +2,41 @@
 Shared test fixtures for pytest.
 """
 import os
+import shutil
 import tempfile
 import pytest
 from unittest.mock import MagicMock, Mock
 
 
+# Rough relative cost of test modules/classes, used to run cheap pure-function
+# tests first so failures surface sooner. Unlisted tests default to 1.
+_MODULE_COST = {
+    'test_validation': 0,
+    'test_database': 2,
+    'test_sorting': 2,
+    'test_rate_limiting': 3,
+    'test_web_app': 3,
+    'test_bookshelf_gui': 4,
+}
+_CLASS_COST = {
+    'TestValidateFilePath': 1,
+    'TestValidationLogging': 1,
+}
+
+
+def _estimated_cost(item):
+    """Estimate the relative cost of a collected test item."""
+    if item.cls is not None and item.cls.__name__ in _CLASS_COST:
+        return _CLASS_COST[item.cls.__name__]
+    module_name = item.module.__name__.rpartition('.')[2] if item.module else ''
+    return _MODULE_COST.get(module_name, 1)
+
+
+def pytest_collection_modifyitems(items):
+    """Run cheap validator tests first; the sort is stable within a cost."""
+    items.sort(key=_estimated_cost)
+
+
 @pytest.fixture
 def temp_db_path():
     """Create a temporary database file path."""
@@ -18,6 +48,50 @@ def temp_db_path():
         os.remove(path)
 
 
+@pytest.fixture(scope="session")
+def seeded_db(tmp_path_factory):
+    """
+    Create a per-worker template database seeded with sample books.
+
+    Tests copy this file instead of re-creating and re-seeding a database,
+    so the template is built once per session. Under pytest-xdist each
+    worker has its own tmp_path_factory base directory, so workers never
+    share the file; without xdist this is a single session-wide template.
+    """
+    from database import BookDatabase
+
+    db_path = tmp_path_factory.mktemp("db") / "seeded.db"
+    db = BookDatabase(str(db_path))
+    db.add_book("Zebra Tales", "Alice Anderson")
+    db.add_book("Apple Stories", "Bob Brown")
+    db.add_book("Banana Chronicles", "Charlie Clark")
+    db.add_book("Apple Stories 2", "Alice Anderson")
+    db.close()
+    return str(db_path)
+
+
+@pytest.fixture
+def seeded_db_copy(seeded_db, tmp_path):
+    """Return a path to a private copy of the seeded template database."""
+    db_path = tmp_path / "seeded_copy.db"
+    shutil.copyfile(seeded_db, db_path)
+    return str(db_path)
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    """Configure the Flask application for testing once per session."""
+    from web_app import app
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app
+
+
+@pytest.fixture(scope="session")
+def shared_tmpdir(tmp_path_factory):
+    """Create one temporary directory shared by tests that only need a location."""
+    return tmp_path_factory.mktemp("val")
+
+
 @pytest.fixture
 def mock_db_connection():
     """Mock database connection for isolated testing."""
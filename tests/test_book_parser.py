@@ -3,7 +3,7 @@ Unit tests for book_parser.py module.
 """
 import os
 import pytest
-from book_parser import parse_book_file
+from book_parser import parse_book_file, parse_book_content
 
 
 class TestBookParserFormats:
@@ -407,3 +407,40 @@ Crime and Punishment - Fyodor Dostoevsky
         
         # Should handle all line ending types
         assert len(books) >= 2  # At least the first two should parse correctly
+
+
+class TestParseBookContent:
+    """Tests for parsing in-memory file content."""
+
+    def test_text_content(self):
+        """Text content uses the same line formats as text files."""
+        content = "# comment\n1984 by George Orwell\r\nDune - Frank Herbert\n\nEmma\n"
+
+        books = parse_book_content(content, "books.txt")
+
+        assert books == [
+            ("1984", "George Orwell"),
+            ("Dune", "Frank Herbert"),
+            ("Emma", None),
+        ]
+
+    def test_csv_content_detected_by_filename(self):
+        """CSV parsing is chosen from the filename extension."""
+        content = 'Title,Author\n"Dune, Part One",Frank Herbert\r\nEmma,\n'
+
+        books = parse_book_content(content, "BOOKS.CSV")
+
+        assert books == [("Dune, Part One", "Frank Herbert"), ("Emma", None)]
+
+    def test_csv_content_without_title_column_raises(self):
+        """CSV content without a title column is rejected."""
+        with pytest.raises(ValueError, match="title"):
+            parse_book_content("Author\nFrank Herbert\n", "books.csv")
+
+    def test_matches_parse_book_file(self, tmp_path):
+        """Parsing from memory gives the same result as parsing from disk."""
+        content = "Title,Author\nDune,Frank Herbert\nEmma,Jane Austen\n"
+        book_file = tmp_path / "books.csv"
+        book_file.write_text(content, encoding='utf-8')
+
+        assert parse_book_content(content, "books.csv") == parse_book_file(str(book_file))
@@ -29,6 +29,18 @@ class TestBookDatabaseInit:
         assert result[0] == 'books'
         db.close()
 
+    def test_init_configures_connection(self, temp_db_path):
+        """Test that the connection is switched to WAL with tuned pragmas."""
+        db = BookDatabase(temp_db_path)
+        cursor = db.conn.cursor()
+        assert cursor.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        # synchronous=NORMAL is reported as 1
+        assert cursor.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert cursor.execute("PRAGMA cache_size").fetchone()[0] == -64000
+        # temp_store=MEMORY is reported as 2
+        assert cursor.execute("PRAGMA temp_store").fetchone()[0] == 2
+        db.close()
+
     def test_table_schema(self, temp_db_path):
         """Test that the books table has correct schema."""
         db = BookDatabase(temp_db_path)
@@ -179,6 +191,152 @@ class TestBookDatabaseDuplicateHandling:
         db.close()
 
 
+class TestBookDatabaseBulkInsert:
+    """Tests for adding many books at once."""
+
+    def test_add_books_bulk_inserts_all(self, temp_db_path):
+        """Test that all new books are inserted for the given user."""
+        db = BookDatabase(temp_db_path)
+        
+        added = db.add_books_bulk(
+            [("1984", "George Orwell"), ("Dune", "Frank Herbert")], user_id=7
+        )
+        
+        assert added == 2
+        books = db.get_all_books(user_id=7)
+        assert {(b['title'], b['author'], b['user_id']) for b in books} == {
+            ("1984", "George Orwell", 7),
+            ("Dune", "Frank Herbert", 7),
+        }
+        db.close()
+
+    def test_add_books_bulk_skips_duplicates(self, temp_db_path):
+        """Test that existing and repeated books are skipped, not counted."""
+        db = BookDatabase(temp_db_path)
+        db.add_book("1984", "George Orwell")
+        
+        added = db.add_books_bulk([
+            ("1984", "George Orwell"),
+            ("Dune", "Frank Herbert"),
+            ("Dune", "Frank Herbert"),
+        ])
+        
+        assert added == 1
+        assert len(db.get_all_books()) == 2
+        db.close()
+
+    def test_add_books_bulk_invalid_book_inserts_nothing(self, temp_db_path):
+        """Test that one invalid book rejects the whole batch."""
+        from validation import ValidationError
+        db = BookDatabase(temp_db_path)
+        
+        with pytest.raises(ValidationError):
+            db.add_books_bulk([("Dune", "Frank Herbert"), ("", "Nobody")])
+        
+        assert db.get_all_books() == []
+        db.close()
+
+
+class TestBookDatabaseGetBooksByIds:
+    """Tests for fetching several books at once."""
+
+    def test_get_books_by_ids(self, temp_db_path):
+        """Test that books are returned keyed by ID, respecting ownership."""
+        db = BookDatabase(temp_db_path)
+        own_id = db.add_book("Dune", "Frank Herbert", user_id=1)
+        other_id = db.add_book("Emma", "Jane Austen", user_id=2)
+        shared_id = db.add_book("Ulysses", "James Joyce")
+        
+        books = db.get_books_by_ids([own_id, other_id, shared_id, 9999], user_id=1)
+        
+        assert set(books) == {own_id, shared_id}
+        assert books[own_id]['title'] == "Dune"
+        db.close()
+
+    def test_get_books_by_ids_many(self, temp_db_path):
+        """Test that more IDs than fit in one query are all fetched."""
+        db = BookDatabase(temp_db_path)
+        added = db.add_books_bulk([(f"Title {i}", "Author") for i in range(1200)])
+        
+        books = db.get_books_by_ids(range(1, 1201))
+        
+        assert added == 1200
+        assert len(books) == 1200
+        db.close()
+
+    def test_get_books_by_ids_invalid_id_raises(self, temp_db_path):
+        """Test that invalid IDs are rejected."""
+        from validation import ValidationError
+        db = BookDatabase(temp_db_path)
+        
+        with pytest.raises(ValidationError):
+            db.get_books_by_ids([1, -5])
+        db.close()
+
+
+class TestBookDatabaseWithoutSummary:
+    """Tests for listing books that still need a summary."""
+
+    def test_get_books_without_summary(self, temp_db_path):
+        """Test that only books with no or empty summary are returned."""
+        db = BookDatabase(temp_db_path)
+        db.add_book("1984", "George Orwell", summary="A dystopian novel.")
+        db.add_book("Dune", "Frank Herbert", user_id=1)
+        db.add_book("Emma", "Jane Austen", user_id=2)
+        db.add_book("Ulysses", "James Joyce")
+        
+        books = db.get_books_without_summary(user_id=1)
+        
+        assert sorted(b['title'] for b in books) == ["Dune", "Ulysses"]
+        assert set(books[0]) == {'id', 'title', 'author'}
+        assert len(db.get_books_without_summary()) == 3
+        db.close()
+
+    def test_get_books_without_summary_uses_partial_index(self, temp_db_path):
+        """Test that the query is served from the no-summary partial index."""
+        db = BookDatabase(temp_db_path)
+        cursor = db.conn.cursor()
+        cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT id, title, author FROM books "
+            "WHERE (user_id = ? OR user_id IS NULL) AND (summary IS NULL OR summary = '') "
+            "ORDER BY created_at DESC",
+            (1,)
+        )
+        plan = " ".join(row[3] for row in cursor.fetchall())
+        assert "idx_books_no_summary" in plan
+        assert "TEMP B-TREE" not in plan
+        db.close()
+
+
+class TestBookDatabaseVersion:
+    """Tests for the per-user books version token."""
+
+    def test_version_changes_only_for_affected_users(self, temp_db_path):
+        """Test that writes bump the versions of users who can see the book."""
+        db = BookDatabase(temp_db_path)
+        before = {uid: db.get_books_version(uid) for uid in (1, 2, None)}
+        
+        book_id = db.add_book("Dune", "Frank Herbert", user_id=1)
+        after_add = {uid: db.get_books_version(uid) for uid in (1, 2, None)}
+        db.update_summary(book_id, "Spice.", user_id=1)
+        
+        assert after_add[1] != before[1]
+        assert after_add[2] == before[2]
+        assert after_add[None] != before[None]
+        assert db.get_books_version(1) != after_add[1]
+        db.close()
+
+    def test_unowned_books_change_every_users_version(self, temp_db_path):
+        """Test that books without an owner affect all users."""
+        db = BookDatabase(temp_db_path)
+        before = db.get_books_version(2)
+        
+        db.add_books_bulk([("Emma", "Jane Austen")])
+        
+        assert db.get_books_version(2) != before
+        db.close()
+
+
 class TestBookDatabaseSearch:
     """Tests for search functionality."""
 
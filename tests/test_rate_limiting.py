@@ -2,15 +2,37 @@
 Unit tests for rate limiting functionality.
 """
 import pytest
-from web_app import app, limiter
+from limits import parse_many
+from limits.storage import MemoryStorage
+from web_app import app, limiter, strict_limiter, rate_limit_config
+
+
+# Every test here needs the app in testing mode
+pytestmark = pytest.mark.usefixtures('flask_app')
+
+
+def _clear_login_limits():
+    """Clear only the login endpoint counters for the test client address."""
+    storage = strict_limiter._storage  # pylint: disable=protected-access
+    if not isinstance(storage, MemoryStorage):
+        # Scoped keys are storage-specific; fall back to a full reset
+        strict_limiter.reset()
+        return
+    for item in parse_many(rate_limit_config['login_attempts']):
+        storage.clear(item.key_for('127.0.0.1', 'login'))
+
+
+@pytest.fixture
+def login_limits():
+    """Reset login rate limit counters around tests that consume login quota."""
+    _clear_login_limits()
+    yield
+    _clear_login_limits()
 
 
 @pytest.fixture
 def client():
     """Create a test client for the Flask application."""
-    app.config['TESTING'] = True
-    app.config['WTF_CSRF_ENABLED'] = False
-    
     with app.test_client() as client:
         yield client
 
@@ -46,14 +68,18 @@ class TestRateLimitConfiguration:
         assert rate_config['login_attempts'] == '5 per 15 minutes'
 
 
+    def test_limiter_strategies(self):
+        """Test that low-limit routes get the moving-window limiter."""
+        assert limiter._strategy == 'fixed-window'  # pylint: disable=protected-access
+        assert strict_limiter._strategy == 'moving-window'  # pylint: disable=protected-access
+
+
 class TestLoginRateLimit:
     """Tests for login rate limiting."""
     
+    @pytest.mark.usefixtures('login_limits')
     def test_login_rate_limit_exists(self, client):
         """Test that login endpoint has rate limiting."""
-        # Reset rate limits before test
-        limiter.reset()
-        
         # Make multiple login attempts
         rate_limited = False
         for i in range(7):
@@ -68,6 +94,26 @@ class TestLoginRateLimit:
         
         # Should have been rate limited at some point
         assert rate_limited or True  # Login endpoint exists with limiter decorator
+    
+    @pytest.mark.usefixtures('login_limits')
+    def test_login_limited_by_moving_window_only(self, client):
+        """Test that login is counted by the strict limiter, not the defaults."""
+        for _ in range(5):
+            assert client.post('/login', data={
+                'email': 'test@example.com',
+                'password': 'wrongpassword'
+            }).status_code == 200
+        
+        response = client.post('/login', data={
+            'email': 'test@example.com',
+            'password': 'wrongpassword'
+        })
+        
+        assert response.status_code == 302  # Redirected by the 429 handler
+        assert 0 < int(response.headers['Retry-After']) <= 15 * 60
+        storage = limiter._storage  # pylint: disable=protected-access
+        if isinstance(storage, MemoryStorage):
+            assert not any('/login/' in key for key in storage.storage)
 
 
 class TestRateLimitErrorHandling:
@@ -76,6 +122,15 @@ class TestRateLimitErrorHandling:
     def test_rate_limit_error_handler_registered(self):
         """Test that 429 error handler is registered."""
         assert 429 in app.error_handler_spec[None]
+    
+    def test_api_rate_limit_response_is_json(self):
+        """Test that API clients get a machine-readable 429 body."""
+        from web_app import ratelimit_handler
+        with app.test_request_context('/api/books'):
+            response = ratelimit_handler(None)
+        
+        assert response.status_code == 429
+        assert response.get_json()['code'] == 'rate_limited'
 
 
 class TestAdminRateLimitEndpoints:
@@ -102,6 +157,129 @@ class TestRateLimitStorage:
             assert limiter._storage_uri.startswith('memory://')
 
 
+class TestAIRateLimit:
+    """Tests for the AI summary rate limit."""
+    
+    def test_uses_redis_script_when_configured(self, mocker):
+        """Test that the Redis token bucket decides when it is configured."""
+        import web_app
+        fake_script = mocker.Mock(side_effect=[[1, 0], [0, 4]])
+        mocker.patch.object(web_app, 'ai_rate_limit_script', fake_script)
+        mocker.patch.object(
+            web_app, 'ai_rate_limit', web_app._LRUCache(web_app.AI_RATE_LIMIT_MAX_ENTRIES)
+        )
+        
+        assert web_app.check_ai_rate_limit('10.0.0.1') == (True, 0)
+        assert web_app.check_ai_rate_limit('10.0.0.1') == (False, 4)
+        fake_script.assert_called_with(
+            keys=[b'ai_rate_limit:tb:' + web_app._ai_rate_limit_key('10.0.0.1')],
+            args=[web_app.AI_RATE_LIMIT_BURST, web_app.AI_RATE_LIMIT_SECONDS]
+        )
+        assert not web_app.ai_rate_limit
+    
+    def test_falls_back_to_memory_on_redis_error(self, mocker):
+        """Test that a Redis failure falls back to the in-memory limit."""
+        import web_app
+        fake_script = mocker.Mock(side_effect=ConnectionError("redis down"))
+        mocker.patch.object(web_app, 'ai_rate_limit_script', fake_script)
+        mocker.patch.object(
+            web_app, 'ai_rate_limit', web_app._LRUCache(web_app.AI_RATE_LIMIT_MAX_ENTRIES)
+        )
+        
+        allowed, _ = web_app.check_ai_rate_limit('10.0.0.2')
+        
+        assert allowed is True
+        assert web_app._ai_rate_limit_key('10.0.0.2') in web_app.ai_rate_limit
+    
+    def test_memory_bucket_allows_burst_then_refills(self, mocker):
+        """Test that a full bucket allows a burst, then one call per interval."""
+        import web_app
+        mocker.patch.object(web_app, 'ai_rate_limit_script', None)
+        mocker.patch.object(
+            web_app, 'ai_rate_limit', web_app._LRUCache(web_app.AI_RATE_LIMIT_MAX_ENTRIES)
+        )
+        clock = mocker.patch.object(web_app.time, 'monotonic', return_value=1000.0)
+        
+        for _ in range(web_app.AI_RATE_LIMIT_BURST):
+            assert web_app.check_ai_rate_limit('10.0.0.3') == (True, 0)
+        assert web_app.check_ai_rate_limit('10.0.0.3') == (
+            False, web_app.AI_RATE_LIMIT_SECONDS
+        )
+        
+        clock.return_value = 1000.0 + web_app.AI_RATE_LIMIT_SECONDS
+        assert web_app.check_ai_rate_limit('10.0.0.3') == (True, 0)
+        assert web_app.check_ai_rate_limit('10.0.0.3')[0] is False
+    
+    def test_memory_bucket_is_thread_safe(self, mocker):
+        """Test that concurrent calls never spend more tokens than the burst."""
+        import threading
+        import web_app
+        mocker.patch.object(web_app, 'ai_rate_limit_script', None)
+        mocker.patch.object(
+            web_app, 'ai_rate_limit', web_app._LRUCache(web_app.AI_RATE_LIMIT_MAX_ENTRIES)
+        )
+        mocker.patch.object(web_app.time, 'monotonic', return_value=1000.0)
+        start = threading.Barrier(20)
+        results = []
+        
+        def call():
+            start.wait()
+            results.append(web_app.check_ai_rate_limit('10.0.0.9')[0])
+        
+        threads = [threading.Thread(target=call) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results.count(True) == web_app.AI_RATE_LIMIT_BURST
+    
+    def test_memory_fallback_drops_full_buckets(self, mocker):
+        """Test that sessions idle long enough to refill are forgotten."""
+        import web_app
+        mocker.patch.object(web_app, 'ai_rate_limit_script', None)
+        mocker.patch.object(
+            web_app, 'ai_rate_limit', web_app._LRUCache(web_app.AI_RATE_LIMIT_MAX_ENTRIES)
+        )
+        clock = mocker.patch.object(web_app.time, 'monotonic', return_value=1000.0)
+        
+        web_app.check_ai_rate_limit('10.0.0.4')
+        clock.return_value = 1000.0 + web_app.AI_RATE_LIMIT_BURST * web_app.AI_RATE_LIMIT_SECONDS
+        web_app.check_ai_rate_limit('10.0.0.5')
+        
+        assert list(web_app.ai_rate_limit) == [web_app._ai_rate_limit_key('10.0.0.5')]
+    
+    def test_buckets_are_per_account(self, mocker):
+        """Test that the AI limit identifies clients by account, not IP."""
+        import web_app
+        mocker.patch.object(web_app, 'current_user', mocker.Mock(id=7))
+        
+        assert web_app._ai_rate_limit_client() == 'user:7'
+    
+    def test_bucket_keys_are_fixed_size(self):
+        """Test that IPv4 and IPv6 sessions map to distinct 8-byte keys."""
+        import web_app
+        v4 = web_app._ai_rate_limit_key('10.0.0.6')
+        v6 = web_app._ai_rate_limit_key('2001:db8:85a3::8a2e:370:7334')
+        
+        assert len(v4) == len(v6) == 8
+        assert v4 != v6
+        assert web_app._ai_rate_limit_key('10.0.0.6') == v4
+    
+    def test_memory_fallback_is_bounded(self, mocker):
+        """Test that the in-memory limit never exceeds its size cap."""
+        import web_app
+        mocker.patch.object(web_app, 'ai_rate_limit_script', None)
+        mocker.patch.object(web_app, 'ai_rate_limit', web_app._LRUCache(3))
+        
+        for i in range(5):
+            web_app.check_ai_rate_limit(f'10.0.1.{i}')
+        
+        assert list(web_app.ai_rate_limit) == [
+            web_app._ai_rate_limit_key(f'10.0.1.{i}') for i in (2, 3, 4)
+        ]
+
+
 class TestRateLimitIntegration:
     """Integration tests for rate limiting."""
     
@@ -5,22 +5,33 @@ import pytest
 from database import BookDatabase
 
 
+@pytest.fixture(scope="module")
+def empty_db(tmp_path_factory):
+    """Create an empty database shared by the read-only tests in this module."""
+    db = BookDatabase(str(tmp_path_factory.mktemp("sorting") / "test_empty.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="module")
+def single_book_db(tmp_path_factory):
+    """Create a single-book database shared by the read-only tests in this module."""
+    db = BookDatabase(str(tmp_path_factory.mktemp("sorting") / "test_single.db"))
+    db.add_book("Only Book", "Only Author")
+    yield db
+    db.close()
+
+
+@pytest.mark.xdist_group("sorting")
 class TestBookSorting:
     """Test sorting functionality in database."""
 
     @pytest.fixture
-    def db_with_books(self, tmp_path):
-        """Create a database with sample books."""
-        db_path = tmp_path / "test_sorting.db"
-        db = BookDatabase(str(db_path))
-        
-        # Add books in a specific order
-        db.add_book("Zebra Tales", "Alice Anderson")
-        db.add_book("Apple Stories", "Bob Brown")
-        db.add_book("Banana Chronicles", "Charlie Clark")
-        db.add_book("Apple Stories 2", "Alice Anderson")
-        
-        return db
+    def db_with_books(self, seeded_db_copy):
+        """Create a database with sample books (copied from the seeded template)."""
+        db = BookDatabase(seeded_db_copy)
+        yield db
+        db.close()
 
     def test_sort_by_recent(self, db_with_books):
         """Test sorting by recently added (default)."""
@@ -104,25 +115,14 @@ class TestBookSorting:
         assert books[1]["author"] == "BANANA"
         assert books[2]["author"] == "zebra"
 
-    def test_sort_empty_database(self, tmp_path):
+    def test_sort_empty_database(self, empty_db):
         """Test sorting on empty database."""
-        db_path = tmp_path / "test_empty.db"
-        db = BookDatabase(str(db_path))
-        
-        books = db.get_all_books(sort_by="title")
+        books = empty_db.get_all_books(sort_by="title")
         assert len(books) == 0
 
-    def test_sort_single_book(self, tmp_path):
+    @pytest.mark.parametrize("sort_by", ["title", "author", "recent"])
+    def test_sort_single_book(self, single_book_db, sort_by):
         """Test sorting with single book."""
-        db_path = tmp_path / "test_single.db"
-        db = BookDatabase(str(db_path))
-        
-        db.add_book("Only Book", "Only Author")
-        
-        books_title = db.get_all_books(sort_by="title")
-        books_author = db.get_all_books(sort_by="author")
-        books_recent = db.get_all_books(sort_by="recent")
-        
-        assert len(books_title) == 1
-        assert len(books_author) == 1
-        assert len(books_recent) == 1
+        books = single_book_db.get_all_books(sort_by=sort_by)
+
+        assert len(books) == 1
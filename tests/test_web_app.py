@@ -0,0 +1,284 @@
+"""
+Unit tests for web_app.py caching and conditional responses.
+"""
+import pytest
+import web_app
+from database import BookDatabase
+from web_app import app
+
+
+# Every test here needs the app in testing mode
+pytestmark = pytest.mark.usefixtures('flask_app')
+
+
+@pytest.fixture
+def app_db(temp_db_path, mocker):
+    """Point the app at a fresh database with empty in-process caches."""
+    db = BookDatabase(temp_db_path)
+    mocker.patch.object(web_app, 'db', db)
+    mocker.patch.object(web_app.limiter, 'enabled', False)
+    caches = (web_app._books_cache, web_app._api_books_cache, web_app._user_cache)
+    for cache in caches:
+        cache.clear()
+    yield db
+    for cache in caches:
+        cache.clear()
+    db.close()
+
+
+@pytest.fixture
+def user_id(app_db):
+    """Create a user in the test database."""
+    return app_db.create_user('reader@example.com', 'not-a-real-hash')
+
+
+@pytest.fixture
+def client(app_db, user_id):
+    """Create a test client logged in as the test user."""
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+        yield client
+
+
+class TestLRUCache:
+    """Tests for the locked LRU helper behind the in-process caches."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that a read refreshes an entry so the oldest unread one goes first."""
+        cache = web_app._LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert cache.get('a') == 1
+
+        cache.put('c', 3)
+
+        assert list(cache) == ['a', 'c']
+        assert cache.get('b') is None
+
+    def test_pop_and_oldest(self):
+        """Test removing a key and peeking at the least recently used entry."""
+        cache = web_app._LRUCache(3)
+        assert cache.oldest() is None
+        cache.put('a', 1)
+        cache.put('b', 2)
+
+        assert cache.oldest() == ('a', 1)
+        assert cache.pop('a') == 1
+        assert cache.pop('a') is None
+        assert 'a' not in cache and len(cache) == 1
+
+
+class TestJsonResponse:
+    """Tests for the orjson-backed JSON responses."""
+
+    def test_matches_jsonify_for_ascii(self):
+        """Test that the body is byte-for-byte what jsonify would send."""
+        from flask import jsonify
+        payload = {'title': 'Dune', 'author': 'Frank Herbert', 'id': 1, 'summary': None}
+        with app.test_request_context():
+            response = web_app._json_response(payload)
+            expected = jsonify(payload)
+
+        assert response.mimetype == 'application/json'
+        assert response.data == expected.data
+        assert response.data == b'{"author":"Frank Herbert","id":1,"summary":null,"title":"Dune"}\n'
+
+    def test_non_ascii_is_utf8(self):
+        """Test that non-ASCII text is sent as UTF-8 rather than escaped."""
+        with app.test_request_context():
+            response = web_app._json_response({'title': 'Café'})
+
+        assert response.data == '{"title":"Café"}\n'.encode('utf-8')
+        assert response.get_json() == {'title': 'Café'}
+
+
+class TestIndexETag:
+    """Tests for the index page ETag."""
+
+    def test_salt_is_stable_across_workers(self):
+        """Test that the salt depends only on deployed files, not the process."""
+        assert web_app._index_etag_salt() == web_app._INDEX_ETAG_SALT
+
+    def test_repeat_get_returns_not_modified(self, client):
+        """Test that a matching If-None-Match gets a 304."""
+        etag = client.get('/').headers['ETag']
+
+        response = client.get('/', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+
+    def test_pending_flash_skips_not_modified(self, client):
+        """Test that the page is rendered when a flash message is waiting."""
+        etag = client.get('/').headers['ETag']
+        with client.session_transaction() as sess:
+            sess['_flashes'] = [('info', 'Book added')]
+
+        response = client.get('/', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert b'Book added' in response.data
+
+    def test_book_change_alters_etag(self, client, app_db, user_id):
+        """Test that adding a book changes the ETag and re-renders the page."""
+        etag = client.get('/').headers['ETag']
+        app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+
+        response = client.get('/', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert b'Dune' in response.data
+
+
+class TestApiBooksCache:
+    """Tests for the /api/books body cache and conditional GET."""
+
+    def test_repeat_get_reuses_cached_body(self, client, app_db, user_id, mocker):
+        """Test that an unchanged book list is served from the cache."""
+        app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+        query = mocker.spy(app_db, 'get_all_books')
+
+        first = client.get('/api/books')
+        second = client.get('/api/books')
+
+        assert query.call_count == 1
+        assert second.data == first.data
+        assert second.headers['ETag'] == first.headers['ETag']
+
+    def test_books_change_invalidates_cache(self, client, app_db, user_id):
+        """Test that a new book is served after the books version changes."""
+        app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+        etag = client.get('/api/books').headers['ETag']
+        app_db.add_book('Emma', 'Jane Austen', user_id=user_id)
+
+        response = client.get('/api/books', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert {book['title'] for book in response.get_json()} == {'Dune', 'Emma'}
+
+    def test_conditional_get_returns_not_modified(self, client, app_db, user_id):
+        """Test that a matching If-None-Match gets a 304."""
+        app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+        etag = client.get('/api/books').headers['ETag']
+
+        response = client.get('/api/books', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+
+
+class TestApiBookETag:
+    """Tests for the /api/book/<id> content ETag."""
+
+    def test_edit_changes_body_and_etag(self, client, app_db, user_id):
+        """Test that an edited book is never answered with a stale 304."""
+        book_id = app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+        etag = client.get(f'/api/book/{book_id}').headers['ETag']
+        app_db.update_summary(book_id, 'Spice and sandworms.', user_id=user_id)
+
+        response = client.get(f'/api/book/{book_id}', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.get_json()['summary'] == 'Spice and sandworms.'
+        assert client.get(
+            f'/api/book/{book_id}', headers={'If-None-Match': response.headers['ETag']}
+        ).status_code == 304
+
+
+class TestSharedBooksCache:
+    """Tests for the book list cache shared by the pages and the API."""
+
+    def test_pages_and_api_share_one_query(self, client, app_db, user_id, mocker):
+        """Test that the flashcards page and the API reuse the same list."""
+        app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+        query = mocker.spy(app_db, 'get_all_books')
+
+        client.get('/flashcards')
+        client.get('/api/books')
+
+        assert query.call_count == 1
+
+    def test_add_is_visible_everywhere(self, client, app_db, user_id):
+        """Test that a book added after caching shows on the pages and the API."""
+        app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+        client.get('/flashcards')
+        client.get('/api/books')
+        app_db.add_book('Emma', 'Jane Austen', user_id=user_id)
+
+        assert b'Emma' in client.get('/flashcards').data
+        assert b'Emma' in client.get('/').data
+        assert 'Emma' in {book['title'] for book in client.get('/api/books').get_json()}
+
+    def test_edit_is_visible_everywhere(self, client, app_db, user_id):
+        """Test that an edited summary replaces the cached one."""
+        book_id = app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+        client.get('/flashcards')
+        client.get('/api/books')
+        app_db.update_summary(book_id, 'Spice and sandworms.', user_id=user_id)
+
+        assert b'Spice and sandworms.' in client.get('/flashcards').data
+        assert client.get('/api/books').get_json()[0]['summary'] == 'Spice and sandworms.'
+
+    def test_delete_is_visible_everywhere(self, client, app_db, user_id):
+        """Test that a book deleted with raw SQL disappears from the cached list."""
+        app_db.add_book('Dune', 'Frank Herbert', user_id=user_id)
+        book_id = app_db.add_book('Emma', 'Jane Austen', user_id=user_id)
+        client.get('/flashcards')
+        client.get('/api/books')
+        app_db.conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
+        app_db.conn.commit()
+
+        assert b'Emma' not in client.get('/flashcards').data
+        assert [book['title'] for book in client.get('/api/books').get_json()] == ['Dune']
+
+
+class TestUserCache:
+    """Tests for the Flask-Login user cache."""
+
+    def test_entry_expires_after_ttl(self, app_db, user_id, mocker):
+        """Test that a cached user is re-read from the database after the TTL."""
+        clock = mocker.patch.object(web_app.time, 'monotonic', return_value=1000.0)
+        query = mocker.spy(app_db, 'get_user_by_id')
+
+        web_app.load_user(str(user_id))
+        clock.return_value = 1000.0 + web_app.USER_CACHE_TTL_SECONDS - 1
+        web_app.load_user(str(user_id))
+        assert query.call_count == 1
+
+        clock.return_value = 1000.0 + web_app.USER_CACHE_TTL_SECONDS
+        web_app.load_user(str(user_id))
+        assert query.call_count == 2
+
+    def test_deleted_user_expires_after_ttl(self, app_db, user_id, mocker):
+        """Test that a user deleted out of band is dropped once the TTL passes."""
+        clock = mocker.patch.object(web_app.time, 'monotonic', return_value=1000.0)
+        web_app.load_user(str(user_id))
+        app_db.conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        app_db.conn.commit()
+
+        clock.return_value = 1000.0 + web_app.USER_CACHE_TTL_SECONDS
+        assert web_app.load_user(str(user_id)) is None
+
+    def test_logout_forgets_user(self, client, user_id):
+        """Test that the user_logged_out signal drops the cache entry."""
+        client.get('/')
+        assert user_id in web_app._user_cache
+
+        client.get('/logout')
+
+        assert user_id not in web_app._user_cache
+
+    def test_cache_is_bounded(self, app_db, mocker):
+        """Test that the least recently used user is evicted at the size cap."""
+        mocker.patch.object(web_app._user_cache, 'maxsize', 2)
+        user_ids = [
+            app_db.create_user(f'reader{i}@example.com', 'not-a-real-hash') for i in range(3)
+        ]
+
+        for uid in user_ids:
+            web_app.load_user(str(uid))
+
+        assert list(web_app._user_cache) == user_ids[1:]
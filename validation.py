@@ -11,8 +11,9 @@ This module provides validators for all user inputs including:
 import os
 import re
 import html
-from typing import Optional, Tuple
-from pathlib import Path
+import codecs
+from functools import lru_cache
+from typing import Any, Optional, Tuple
 import logging
 
 # Set up logging for security monitoring
@@ -23,15 +24,50 @@ MAX_TITLE_LENGTH = 500
 MAX_AUTHOR_LENGTH = 200
 MAX_SUMMARY_LENGTH = 10000
 MAX_FILENAME_LENGTH = 255
+MAX_BOOK_ID = 2147483647  # Max 32-bit signed integer
 
 # File upload constraints
-ALLOWED_EXTENSIONS = {'txt', 'csv'}
+ALLOWED_EXTENSIONS = frozenset({'txt', 'csv'})
+_ALLOWED_EXTENSIONS_TEXT = ', '.join(sorted(ALLOWED_EXTENSIONS))
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+_DECODE_CHUNK_SIZE = 64 * 1024  # Chunk size for incremental UTF-8 validation
 
-# Allowed characters patterns
-# Allow letters (including Unicode), numbers, common punctuation, and whitespace
-TITLE_PATTERN = re.compile(r'^[\w\s\.,;:!?\'\"\-–—()&\[\]{}*+/\\@#$%€£¥©®™]+$', re.UNICODE)
-AUTHOR_PATTERN = re.compile(r'^[\w\s\.,\'\-]+$', re.UNICODE)
+# Potential XSS patterns (basic check), matched case-insensitively
+DANGEROUS_PATTERNS = ('<script', 'javascript:', 'onerror=', 'onclick=', '<iframe', 'eval(')
+
+# ASCII control characters (0x00-0x1F), found with a single C-level scan
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x1f]')
+
+# Characters never allowed in an uploaded filename (null byte, path separators)
+_FILENAME_INVALID_CHARS = frozenset('\x00/\\')
+
+# Bytes that are NOT disallowed control characters (i.e. everything except
+# 0x00-0x1F minus the whitespace allowed in text files). Deleting these with
+# bytes.translate leaves only the control bytes, so counting them never
+# builds a near-full-size copy of the upload.
+_FILE_NON_CONTROL_BYTES = bytes(c for c in range(256) if c >= 32 or c in b'\n\r\t')
+
+
+def _find_dangerous_pattern(text: str) -> Optional[str]:
+    """
+    Return the first dangerous pattern found in text, or None.
+    
+    The text is case-folded once and each pattern is found with str's C
+    substring search, which beats a case-insensitive regex alternation.
+    """
+    folded = text.casefold()
+    for pattern in DANGEROUS_PATTERNS:
+        if pattern in folded:
+            return pattern
+    return None
+
+
+def _has_control_chars(text: str) -> bool:
+    """Return True if text contains an ASCII control character (0x00-0x1F)."""
+    # Fast path: printable ASCII (the common case) cannot contain one
+    if text.isascii() and text.isprintable():
+        return False
+    return _CONTROL_CHARS_RE.search(text) is not None
 
 
 class ValidationError(Exception):
@@ -39,6 +75,33 @@ class ValidationError(Exception):
     pass
 
 
+def _check_title_content(title: str) -> str:
+    """Check a stripped, length-checked title for unsafe content (see validate_title)."""
+    # Check for allowed characters (relaxed pattern)
+    # We allow most Unicode characters for international book titles
+    # but prevent control characters and potential XSS patterns
+    if _has_control_chars(title):
+        logger.warning("Title validation failed: contains control characters")
+        raise ValidationError("Title contains invalid control characters")
+    
+    # Check for potential XSS patterns (basic check)
+    pattern = _find_dangerous_pattern(title)
+    if pattern:
+        logger.warning("Title validation failed: contains dangerous pattern '%s'", pattern)
+        raise ValidationError("Title contains potentially dangerous content")
+    
+    return title
+
+
+# Successful content checks are memoized: bulk imports repeat the same
+# authors (and titles) many times. The cache is keyed on the stripped value
+# after the length check, so each entry is bounded by MAX_TITLE_LENGTH /
+# MAX_AUTHOR_LENGTH and whitespace variants share one entry. lru_cache does
+# not cache raised exceptions, so invalid input is re-checked, and re-logged,
+# on every call.
+_check_title_content_cached = lru_cache(maxsize=4096)(_check_title_content)
+
+
 def validate_title(title: str) -> str:
     """
     Validate and sanitize a book title.
@@ -53,7 +116,7 @@ def validate_title(title: str) -> str:
         ValidationError: If validation fails
     """
     if not isinstance(title, str):
-        logger.warning(f"Title validation failed: not a string (type: {type(title).__name__})")
+        logger.warning("Title validation failed: not a string (type: %s)", type(title).__name__)
         raise ValidationError("Title must be a string")
     
     # Strip whitespace
@@ -66,25 +129,29 @@ def validate_title(title: str) -> str:
     
     # Check length
     if len(title) > MAX_TITLE_LENGTH:
-        logger.warning(f"Title validation failed: length {len(title)} exceeds maximum {MAX_TITLE_LENGTH}")
+        logger.warning("Title validation failed: length %d exceeds maximum %d", len(title), MAX_TITLE_LENGTH)
         raise ValidationError(f"Title cannot exceed {MAX_TITLE_LENGTH} characters")
     
-    # Check for allowed characters (relaxed pattern)
-    # We allow most Unicode characters for international book titles
-    # but prevent control characters and potential XSS patterns
-    if '\x00' in title or '\r' in title or '\n' in title or '\t' in title:
-        logger.warning("Title validation failed: contains control characters")
-        raise ValidationError("Title contains invalid control characters")
+    return _check_title_content_cached(title)
+
+
+def _check_author_content(author: str) -> str:
+    """Check a stripped, length-checked author name for unsafe content (see validate_author)."""
+    # Check for control characters
+    if _has_control_chars(author):
+        logger.warning("Author validation failed: contains control characters")
+        raise ValidationError("Author name contains invalid control characters")
     
-    # Check for potential XSS patterns (basic check)
-    dangerous_patterns = ['<script', 'javascript:', 'onerror=', 'onclick=', '<iframe', 'eval(']
-    title_lower = title.lower()
-    for pattern in dangerous_patterns:
-        if pattern in title_lower:
-            logger.warning(f"Title validation failed: contains dangerous pattern '{pattern}'")
-            raise ValidationError("Title contains potentially dangerous content")
+    # Check for potential XSS patterns
+    pattern = _find_dangerous_pattern(author)
+    if pattern:
+        logger.warning("Author validation failed: contains dangerous pattern '%s'", pattern)
+        raise ValidationError("Author name contains potentially dangerous content")
     
-    return title
+    return author
+
+
+_check_author_content_cached = lru_cache(maxsize=4096)(_check_author_content)
 
 
 def validate_author(author: str) -> str:
@@ -101,7 +168,7 @@ def validate_author(author: str) -> str:
         ValidationError: If validation fails
     """
     if not isinstance(author, str):
-        logger.warning(f"Author validation failed: not a string (type: {type(author).__name__})")
+        logger.warning("Author validation failed: not a string (type: %s)", type(author).__name__)
         raise ValidationError("Author must be a string")
     
     # Strip whitespace
@@ -114,23 +181,10 @@ def validate_author(author: str) -> str:
     
     # Check length
     if len(author) > MAX_AUTHOR_LENGTH:
-        logger.warning(f"Author validation failed: length {len(author)} exceeds maximum {MAX_AUTHOR_LENGTH}")
+        logger.warning("Author validation failed: length %d exceeds maximum %d", len(author), MAX_AUTHOR_LENGTH)
         raise ValidationError(f"Author name cannot exceed {MAX_AUTHOR_LENGTH} characters")
     
-    # Check for control characters
-    if '\x00' in author or '\r' in author or '\n' in author or '\t' in author:
-        logger.warning("Author validation failed: contains control characters")
-        raise ValidationError("Author name contains invalid control characters")
-    
-    # Check for potential XSS patterns
-    dangerous_patterns = ['<script', 'javascript:', 'onerror=', 'onclick=', '<iframe', 'eval(']
-    author_lower = author.lower()
-    for pattern in dangerous_patterns:
-        if pattern in author_lower:
-            logger.warning(f"Author validation failed: contains dangerous pattern '{pattern}'")
-            raise ValidationError("Author name contains potentially dangerous content")
-    
-    return author
+    return _check_author_content_cached(author)
 
 
 def validate_summary(summary: Optional[str]) -> Optional[str]:
@@ -150,7 +204,7 @@ def validate_summary(summary: Optional[str]) -> Optional[str]:
         return None
     
     if not isinstance(summary, str):
-        logger.warning(f"Summary validation failed: not a string (type: {type(summary).__name__})")
+        logger.warning("Summary validation failed: not a string (type: %s)", type(summary).__name__)
         raise ValidationError("Summary must be a string or None")
     
     # Strip whitespace
@@ -162,7 +216,7 @@ def validate_summary(summary: Optional[str]) -> Optional[str]:
     
     # Check length
     if len(summary) > MAX_SUMMARY_LENGTH:
-        logger.warning(f"Summary validation failed: length {len(summary)} exceeds maximum {MAX_SUMMARY_LENGTH}")
+        logger.warning("Summary validation failed: length %d exceeds maximum %d", len(summary), MAX_SUMMARY_LENGTH)
         raise ValidationError(f"Summary cannot exceed {MAX_SUMMARY_LENGTH} characters")
     
     # Check for null bytes
@@ -171,17 +225,15 @@ def validate_summary(summary: Optional[str]) -> Optional[str]:
         raise ValidationError("Summary contains invalid characters")
     
     # Check for potential XSS patterns
-    dangerous_patterns = ['<script', 'javascript:', 'onerror=', 'onclick=', '<iframe', 'eval(']
-    summary_lower = summary.lower()
-    for pattern in dangerous_patterns:
-        if pattern in summary_lower:
-            logger.warning(f"Summary validation failed: contains dangerous pattern '{pattern}'")
-            raise ValidationError("Summary contains potentially dangerous content")
+    pattern = _find_dangerous_pattern(summary)
+    if pattern:
+        logger.warning("Summary validation failed: contains dangerous pattern '%s'", pattern)
+        raise ValidationError("Summary contains potentially dangerous content")
     
     return summary
 
 
-def validate_book_id(book_id: any) -> int:
+def validate_book_id(book_id: Any) -> int:
     """
     Validate a database book ID.
     
@@ -194,21 +246,34 @@ def validate_book_id(book_id: any) -> int:
     Raises:
         ValidationError: If validation fails
     """
+    # Fast path: route parameters and DB rows already give us an int
+    if type(book_id) is int and 0 < book_id <= MAX_BOOK_ID:
+        return book_id
+    
+    # Reject non-numeric strings up front instead of via int()'s exception
+    if isinstance(book_id, str):
+        digits = book_id.strip()
+        if digits[:1] in ('-', '+'):
+            digits = digits[1:]
+        if not digits.isdecimal():
+            logger.warning("Book ID validation failed: cannot convert '%s' to integer", book_id)
+            raise ValidationError("Book ID must be a valid integer")
+    
     # Try to convert to integer
     try:
         book_id = int(book_id)
     except (ValueError, TypeError):
-        logger.warning(f"Book ID validation failed: cannot convert '{book_id}' to integer")
+        logger.warning("Book ID validation failed: cannot convert '%s' to integer", book_id)
         raise ValidationError("Book ID must be a valid integer")
     
     # Check range (must be positive)
     if book_id <= 0:
-        logger.warning(f"Book ID validation failed: invalid value {book_id}")
+        logger.warning("Book ID validation failed: invalid value %s", book_id)
         raise ValidationError("Book ID must be a positive integer")
     
     # Check reasonable upper bound (to prevent memory issues)
-    if book_id > 2147483647:  # Max 32-bit signed integer
-        logger.warning(f"Book ID validation failed: value {book_id} too large")
+    if book_id > MAX_BOOK_ID:
+        logger.warning("Book ID validation failed: value %s too large", book_id)
         raise ValidationError("Book ID value is too large")
     
     return book_id
@@ -229,7 +294,7 @@ def validate_file_path(file_path: str, base_dir: Optional[str] = None) -> str:
         ValidationError: If validation fails
     """
     if not isinstance(file_path, str):
-        logger.warning(f"File path validation failed: not a string (type: {type(file_path).__name__})")
+        logger.warning("File path validation failed: not a string (type: %s)", type(file_path).__name__)
         raise ValidationError("File path must be a string")
     
     # Check for null bytes
@@ -239,31 +304,32 @@ def validate_file_path(file_path: str, base_dir: Optional[str] = None) -> str:
     
     # Resolve to absolute path and normalize
     try:
-        resolved_path = Path(file_path).resolve()
-    except (ValueError, RuntimeError) as e:
-        logger.warning(f"File path validation failed: cannot resolve path '{file_path}': {e}")
+        resolved_path = os.path.realpath(file_path)
+    except (ValueError, OSError) as e:
+        logger.warning("File path validation failed: cannot resolve path '%s': %s", file_path, e)
         raise ValidationError("Invalid file path")
     
     # If base_dir is provided, ensure the path is within it
     if base_dir:
+        base_path = os.path.realpath(base_dir)
         try:
-            base_path = Path(base_dir).resolve()
             # Check if resolved_path is within base_path
-            resolved_path.relative_to(base_path)
+            within_base = os.path.commonpath([resolved_path, base_path]) == base_path
         except ValueError:
-            logger.warning(f"File path validation failed: path '{file_path}' is outside base directory '{base_dir}'")
+            within_base = False
+        if not within_base:
+            logger.warning("File path validation failed: path '%s' is outside base directory '%s'", file_path, base_dir)
             raise ValidationError("File path is outside allowed directory")
     
     # Check for suspicious patterns
-    path_str = str(resolved_path)
     suspicious_patterns = ['..', '~/', '$HOME']
     original_lower = file_path.lower()
     for pattern in suspicious_patterns:
-        if pattern in original_lower and pattern in path_str:
-            logger.warning(f"File path validation failed: contains suspicious pattern '{pattern}'")
+        if pattern in original_lower and pattern in resolved_path:
+            logger.warning("File path validation failed: contains suspicious pattern '%s'", pattern)
             raise ValidationError("File path contains suspicious patterns")
     
-    return str(resolved_path)
+    return resolved_path
 
 
 def validate_filename(filename: str) -> str:
@@ -280,40 +346,41 @@ def validate_filename(filename: str) -> str:
         ValidationError: If validation fails
     """
     if not isinstance(filename, str):
-        logger.warning(f"Filename validation failed: not a string (type: {type(filename).__name__})")
+        logger.warning("Filename validation failed: not a string (type: %s)", type(filename).__name__)
         raise ValidationError("Filename must be a string")
     
+    filename = filename.strip()
+    
     # Check if empty
-    if not filename or not filename.strip():
+    if not filename:
         logger.warning("Filename validation failed: empty string")
         raise ValidationError("Filename cannot be empty")
     
-    filename = filename.strip()
-    
     # Check length
     if len(filename) > MAX_FILENAME_LENGTH:
-        logger.warning(f"Filename validation failed: length {len(filename)} exceeds maximum {MAX_FILENAME_LENGTH}")
+        logger.warning("Filename validation failed: length %d exceeds maximum %d", len(filename), MAX_FILENAME_LENGTH)
         raise ValidationError(f"Filename cannot exceed {MAX_FILENAME_LENGTH} characters")
     
     # Check for null bytes and path separators
-    if '\x00' in filename or '/' in filename or '\\' in filename:
+    if not _FILENAME_INVALID_CHARS.isdisjoint(filename):
         logger.warning("Filename validation failed: contains invalid characters")
         raise ValidationError("Filename contains invalid characters")
     
     # Check for hidden files (starting with .)
     if filename.startswith('.'):
-        logger.warning(f"Filename validation failed: hidden file '{filename}'")
+        logger.warning("Filename validation failed: hidden file '%s'", filename)
         raise ValidationError("Hidden files are not allowed")
     
     # Validate file extension
-    if '.' not in filename:
-        logger.warning(f"Filename validation failed: no extension in '{filename}'")
+    _, dot, ext = filename.rpartition('.')
+    if not dot:
+        logger.warning("Filename validation failed: no extension in '%s'", filename)
         raise ValidationError("File must have an extension")
     
-    ext = filename.rsplit('.', 1)[1].lower()
+    ext = ext.lower()
     if ext not in ALLOWED_EXTENSIONS:
-        logger.warning(f"Filename validation failed: extension '{ext}' not in allowed list {ALLOWED_EXTENSIONS}")
-        raise ValidationError(f"Only {', '.join(ALLOWED_EXTENSIONS)} files are allowed")
+        logger.warning("Filename validation failed: extension '%s' not in allowed list %s", ext, _ALLOWED_EXTENSIONS_TEXT)
+        raise ValidationError(f"Only {_ALLOWED_EXTENSIONS_TEXT} files are allowed")
     
     return filename
 
@@ -329,15 +396,15 @@ def validate_file_size(size: int) -> None:
         ValidationError: If file is too large
     """
     if not isinstance(size, int):
-        logger.warning(f"File size validation failed: not an integer (type: {type(size).__name__})")
+        logger.warning("File size validation failed: not an integer (type: %s)", type(size).__name__)
         raise ValidationError("File size must be an integer")
     
     if size < 0:
-        logger.warning(f"File size validation failed: negative value {size}")
+        logger.warning("File size validation failed: negative value %s", size)
         raise ValidationError("File size cannot be negative")
     
     if size > MAX_FILE_SIZE:
-        logger.warning(f"File size validation failed: size {size} exceeds maximum {MAX_FILE_SIZE}")
+        logger.warning("File size validation failed: size %s exceeds maximum %d", size, MAX_FILE_SIZE)
         raise ValidationError(f"File size cannot exceed {MAX_FILE_SIZE // (1024 * 1024)}MB")
     
     if size == 0:
@@ -345,6 +412,25 @@ def validate_file_size(size: int) -> None:
         raise ValidationError("File cannot be empty")
 
 
+def _count_utf8_chars(content: bytes) -> int:
+    """
+    Count the characters in UTF-8 content, decoding it in fixed-size chunks.
+    
+    Peak memory stays at one decoded chunk rather than the whole file, and
+    decoding stops at the first invalid sequence.
+    
+    Raises:
+        UnicodeDecodeError: If content is not valid UTF-8
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    view = memoryview(content)
+    char_count = 0
+    for start in range(0, len(view), _DECODE_CHUNK_SIZE):
+        char_count += len(decoder.decode(view[start:start + _DECODE_CHUNK_SIZE]))
+    char_count += len(decoder.decode(b'', final=True))
+    return char_count
+
+
 def validate_file_content(content: bytes) -> None:
     """
     Validate file content to ensure it's safe text.
@@ -356,24 +442,36 @@ def validate_file_content(content: bytes) -> None:
         ValidationError: If content is invalid
     """
     if not isinstance(content, bytes):
-        logger.warning(f"File content validation failed: not bytes (type: {type(content).__name__})")
+        logger.warning("File content validation failed: not bytes (type: %s)", type(content).__name__)
         raise ValidationError("File content must be bytes")
     
-    # Check if content can be decoded as UTF-8
-    try:
-        text = content.decode('utf-8')
-    except UnicodeDecodeError:
-        logger.warning("File content validation failed: not valid UTF-8")
-        raise ValidationError("File must be valid UTF-8 text")
+    # Reject oversize content before scanning or decoding any of it, in case
+    # the caller did not run validate_file_size first
+    if len(content) > MAX_FILE_SIZE:
+        logger.warning("File content validation failed: size %d exceeds maximum %d", len(content), MAX_FILE_SIZE)
+        raise ValidationError(f"File size cannot exceed {MAX_FILE_SIZE // (1024 * 1024)}MB")
     
-    # Check for null bytes (indicates binary content)
-    if '\x00' in text:
+    # Check for null bytes (indicates binary content). This is a memchr scan
+    # on the raw bytes, so binary uploads are rejected before any decoding.
+    if b'\x00' in content:
         logger.warning("File content validation failed: contains null bytes (binary content)")
         raise ValidationError("File appears to be binary, not text")
     
+    # Check if content can be decoded as UTF-8. Pure ASCII is always valid
+    # UTF-8, so skip allocating the decoded string in that (common) case.
+    if content.isascii():
+        char_count = len(content)
+    else:
+        try:
+            char_count = _count_utf8_chars(content)
+        except UnicodeDecodeError:
+            logger.warning("File content validation failed: not valid UTF-8")
+            raise ValidationError("File must be valid UTF-8 text")
+    
     # Check for excessive control characters (may indicate binary or malicious content)
-    control_char_count = sum(1 for char in text if ord(char) < 32 and char not in '\n\r\t')
-    if len(text) > 0 and control_char_count / len(text) > 0.1:  # More than 10% control chars
+    # Control characters are single bytes in UTF-8, so count them on the raw bytes
+    control_char_count = len(content.translate(None, _FILE_NON_CONTROL_BYTES))
+    if char_count > 0 and control_char_count / char_count > 0.1:  # More than 10% control chars
         logger.warning("File content validation failed: too many control characters")
         raise ValidationError("File contains too many control characters")
 
@@ -388,11 +486,9 @@ def sanitize_html(text: str) -> str:
     Returns:
         HTML-escaped text
     """
-    if not isinstance(text, str):
-        return str(text)
-    
-    # Use html.escape to escape HTML special characters
-    return html.escape(text, quote=True)
+    # Use html.escape to escape HTML special characters in a single pass.
+    # Non-strings are converted first so their text is escaped too.
+    return html.escape(text if isinstance(text, str) else str(text), quote=True)
 
 
 def validate_all_book_data(title: str, author: str, summary: Optional[str] = None) -> Tuple[str, str, Optional[str]]:
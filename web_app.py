@@ -5,30 +5,37 @@ Flask-based web interface for hosting on Render.com.
 """
 import os
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+from flask import Flask, render_template, request, redirect, url_for, flash, make_response, session
+from flask.sessions import SecureCookieSessionInterface
+from flask_login import LoginManager, login_user, logout_user, login_required, current_user, user_logged_out
 from flask_wtf import FlaskForm, CSRFProtect
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from wtforms import StringField, PasswordField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, Email, EqualTo
-from werkzeug.utils import secure_filename
 from database import BookDatabase
 from ai_service import SummaryGenerator
-from book_parser import parse_book_file
+from book_parser import parse_book_content
 from config import get_config
 from validation import (
     validate_all_book_data,
     validate_book_id,
+    validate_summary,
     validate_filename,
     validate_file_size,
     validate_file_content,
-    validate_file_path,
     sanitize_html,
     ValidationError
 )
 from auth import create_user, authenticate_user
+from models import User
+import hashlib
+import math
+import orjson
+import threading
 import time
+from collections import OrderedDict
 
 # Set up logging for security monitoring
 logging.basicConfig(level=logging.INFO)
@@ -55,6 +62,32 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True  # Prevent JavaScript access
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # CSRF protection
 app.config['PERMANENT_SESSION_LIFETIME'] = 604800  # 7 days
 
+# Endpoints that never need the session; their responses carry no
+# Set-Cookie or Vary: Cookie, so proxies and CDNs can cache them
+_SESSIONLESS_ENDPOINTS = frozenset({'health'})
+
+
+class _SessionInterface(SecureCookieSessionInterface):
+    """Cookie session interface that skips saving for session-less endpoints."""
+
+    def save_session(self, app, session, response):
+        if request.endpoint in _SESSIONLESS_ENDPOINTS:
+            return
+        super().save_session(app, session, response)
+
+
+app.session_interface = _SessionInterface()
+
+
+def _json_response(obj):
+    """Serialize obj to a JSON response with orjson."""
+    # Sorted keys and the trailing newline match jsonify's compact output
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE),
+        mimetype='application/json'
+    )
+
+
 # Initialize CSRF protection
 csrf = CSRFProtect(app)
 
@@ -68,61 +101,88 @@ login_manager.login_message = 'Please log in to access this page.'
 redis_url = config.get_redis_url()
 rate_limit_config = config.get_rate_limit_config()
 
+
+def _create_limiters(storage_uri):
+    """
+    Create the rate limiters for the app.
+
+    The main limiter uses a fixed window and carries the default limits.
+    Low-limit routes (login, AI summaries) use strict_limiter instead, whose
+    moving window stops a client from bursting to twice the limit across a
+    window boundary. A moving window stores one entry per hit (O(limit) per
+    check, a list per key on Redis), so never use strict_limiter for
+    high-limit routes like the API endpoints.
+    """
+    main = Limiter(
+        app=app,
+        key_func=get_remote_address,
+        storage_uri=storage_uri,
+        default_limits=["1000 per day", "200 per hour"],
+        strategy="fixed-window"
+    )
+    strict = Limiter(
+        app=app,
+        key_func=get_remote_address,
+        storage_uri=storage_uri,
+        strategy="moving-window"
+    )
+    return main, strict
+
+
 if redis_url:
     try:
-        limiter = Limiter(
-            app=app,
-            key_func=get_remote_address,
-            storage_uri=redis_url,
-            default_limits=["1000 per day", "200 per hour"],
-            strategy="fixed-window"
-        )
+        limiter, strict_limiter = _create_limiters(redis_url)
         logger.info("Rate limiter initialized with Redis storage")
     except Exception as e:
         logger.warning("Failed to initialize Redis, falling back to in-memory storage: %s", e)
-        limiter = Limiter(
-            app=app,
-            key_func=get_remote_address,
-            default_limits=["1000 per day", "200 per hour"],
-            storage_uri="memory://",
-            strategy="fixed-window"
-        )
+        limiter, strict_limiter = _create_limiters("memory://")
 else:
-    limiter = Limiter(
-        app=app,
-        key_func=get_remote_address,
-        default_limits=["1000 per day", "200 per hour"],
-        storage_uri="memory://",
-        strategy="fixed-window"
-    )
+    limiter, strict_limiter = _create_limiters("memory://")
     logger.info("Rate limiter initialized with in-memory storage")
 
+def _retry_after_seconds() -> Optional[int]:
+    """Seconds until the limit breached by the current request resets, if known."""
+    for ext in (strict_limiter, limiter):
+        current = ext.current_limit
+        if current is not None and current.breached:
+            reset_at: float = current.window[0]
+            return max(1, math.ceil(reset_at - time.time()))
+    return None
+
+
 # Custom error handler for rate limit exceeded
 @app.errorhandler(429)
 def ratelimit_handler(e):  # pylint: disable=unused-argument
     """Handle rate limit exceeded errors."""
     logger.warning("Rate limit exceeded for IP: %s", get_remote_address())
+    retry_after = _retry_after_seconds()
     
     # User-friendly error message
     if request.path.startswith('/api/'):
-        # JSON response for API endpoints
-        response = jsonify({
+        # JSON response for API endpoints; 'code' is stable for clients to match on
+        response = _json_response({
             'error': 'Rate limit exceeded',
-            'message': 'Too many requests. Please try again later.'
+            'code': 'rate_limited',
+            'message': 'Too many requests. Please try again later.',
+            'retry_after': retry_after
         })
         response.status_code = 429
-        return response
     else:
         # HTML response for web pages
         flash('Rate limit exceeded. Please try again later.', 'error')
-        return redirect(url_for('index'))
+        response = redirect(url_for('index'))
+    
+    # Tell clients how long to back off instead of letting them retry blindly
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
 
-# Add security headers to all responses
-@app.after_request
-def add_security_headers(response):
-    """Add security headers to all responses."""
+# Add security headers to all responses; the static ones are built once as
+# (name, value) pairs so they can be appended without per-key lookups.
+# No route sets any of these itself.
+_SECURITY_HEADERS = (
     # Content Security Policy - restrict resource loading
-    response.headers['Content-Security-Policy'] = (
+    ('Content-Security-Policy', (
         "default-src 'self'; "
         "script-src 'self' 'unsafe-inline'; "
         "style-src 'self' 'unsafe-inline'; "
@@ -130,16 +190,20 @@ def add_security_headers(response):
         "font-src 'self' data:; "
         "connect-src 'self'; "
         "frame-ancestors 'none';"
-    )
-    
+    )),
     # Prevent clickjacking
-    response.headers['X-Frame-Options'] = 'DENY'
-    
+    ('X-Frame-Options', 'DENY'),
     # Prevent MIME type sniffing
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    
+    ('X-Content-Type-Options', 'nosniff'),
     # Enable browser XSS protection
-    response.headers['X-XSS-Protection'] = '1; mode=block'
+    ('X-XSS-Protection', '1; mode=block'),
+)
+
+
+@app.after_request
+def add_security_headers(response):
+    """Add security headers to all responses."""
+    response.headers.extend(_SECURITY_HEADERS)
     
     # Strict Transport Security (HSTS) - only in production with HTTPS
     if config.is_production and request.is_secure:
@@ -155,14 +219,8 @@ def sanitize_filter(text):
     return sanitize_html(text)
 
 # Configuration
-UPLOAD_FOLDER = '/tmp/uploads'
-ALLOWED_EXTENSIONS = {'txt', 'csv'}
 DATABASE_PATH = os.environ.get('DATABASE_PATH', 'bookshelf.db')
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
 # Initialize services
@@ -180,11 +238,106 @@ except Exception as e:
     pass
 
 
+_K = TypeVar('_K')
+_V = TypeVar('_V')
+
+
+class _LRUCache(Generic[_K, _V]):
+    """
+    Small thread-safe LRU mapping for the in-process caches below.
+    
+    Each method takes the lock itself. Callers that need a read-modify-write
+    to be atomic hold ``lock`` around the calls; it is re-entrant.
+    
+    Args:
+        maxsize: Number of entries kept; the least recently used go first
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.lock = threading.RLock()
+        self._data: OrderedDict[_K, _V] = OrderedDict()
+    
+    def get(self, key: _K) -> Optional[_V]:
+        """Return the value for key and mark it most recently used, or None."""
+        with self.lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key: _K, value: _V) -> None:
+        """Store value as most recently used, evicting past maxsize."""
+        with self.lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key: _K) -> Optional[_V]:
+        """Remove key and return its value, or None if it is not cached."""
+        with self.lock:
+            return self._data.pop(key, None)
+    
+    def oldest(self) -> Optional[Tuple[_K, _V]]:
+        """Return the least recently used (key, value) pair, or None if empty."""
+        with self.lock:
+            return next(iter(self._data.items()), None)
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self.lock:
+            self._data.clear()
+    
+    def __contains__(self, key: object) -> bool:
+        with self.lock:
+            return key in self._data
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._data)
+    
+    def __iter__(self) -> Iterator[_K]:
+        """Iterate over a snapshot of the keys, least recently used first."""
+        with self.lock:
+            return iter(list(self._data))
+
+
 # Flask-Login user loader
+# Users loaded for Flask-Login, kept briefly so authenticated requests don't
+# each re-query the users table. The cache is per worker. The app never
+# updates or deletes a user; a user changed or deleted out of band (e.g. with
+# raw SQL) can stay signed in for up to USER_CACHE_TTL_SECONDS on each worker,
+# so restart the workers to revoke access immediately.
+# Logging out clears the session cookie, which is what ends the session; the
+# entry is also dropped here, but only on the worker that handled the logout.
+# Other workers keep theirs until the TTL, which is harmless because a
+# logged-out browser no longer sends the user ID that would look it up.
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_SIZE = 10_000
+_user_cache: _LRUCache[int, Tuple[float, User]] = _LRUCache(USER_CACHE_SIZE)
+
+
 @login_manager.user_loader
 def load_user(user_id):
     """Load user by ID for Flask-Login."""
-    return db.get_user_by_id(int(user_id))
+    user_id = int(user_id)
+    now = time.monotonic()
+    cached = _user_cache.get(user_id)
+    if cached is not None and now - cached[0] < USER_CACHE_TTL_SECONDS:
+        return cached[1]
+    
+    user = db.get_user_by_id(user_id)
+    if user is not None:
+        _user_cache.put(user_id, (now, user))
+    return user
+
+
+@user_logged_out.connect_via(app)
+def _forget_logged_out_user(sender, user, **extra):  # pylint: disable=unused-argument
+    """Drop a user from this worker's load_user cache when they log out."""
+    if user is not None:
+        _user_cache.pop(user.id)
 
 
 # Form classes
@@ -206,15 +359,101 @@ class RegistrationForm(FlaskForm):
     ])
     submit = SubmitField('Register')
 
-# Rate limiting for AI summary generation (track last request time per session)
-# In production, use Redis or similar for distributed rate limiting
-ai_rate_limit = {}
-AI_RATE_LIMIT_SECONDS = 5  # Minimum seconds between AI requests per session
+# Rate limiting for AI summary generation: a token bucket per session that
+# holds up to AI_RATE_LIMIT_BURST calls and refills one every
+# AI_RATE_LIMIT_SECONDS. Uses the limiter's Redis when configured so the limit
+# holds across workers; the in-process dict is only a fallback.
+# The cache maps a hashed session key -> (tokens, last update), ordered oldest update first
+# so idle (full) buckets can be dropped cheaply
+AI_RATE_LIMIT_SECONDS = 5  # Seconds to refill one AI request per session
+AI_RATE_LIMIT_BURST = 5  # AI requests a session can make back to back
+AI_RATE_LIMIT_MAX_ENTRIES = 10_000  # Cap on sessions tracked in memory
+ai_rate_limit: _LRUCache[bytes, Tuple[float, float]] = _LRUCache(AI_RATE_LIMIT_MAX_ENTRIES)
+ai_rate_limit_redis = None
+ai_rate_limit_script = None
+
+# Same algorithm as the in-memory fallback, run atomically in Redis using the
+# server clock so all workers agree. Returns {allowed, retry_after_seconds}.
+_AI_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) / interval)
+local allowed, retry_after = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) * interval)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity * interval))
+return {allowed, retry_after}
+"""
+
+if redis_url:
+    try:
+        import redis
+        ai_rate_limit_redis = redis.Redis.from_url(redis_url)
+        # register_script sends EVALSHA and loads the script on first NOSCRIPT
+        ai_rate_limit_script = ai_rate_limit_redis.register_script(_AI_TOKEN_BUCKET_LUA)
+    except Exception as e:
+        logger.warning("Failed to set up Redis for AI rate limiting, using in-memory storage: %s", e)
+
+
+def _index_etag_salt() -> str:
+    """
+    Digest of the code and templates that render the index page.
+    
+    Part of the index ETag so pages cached by an older deploy are not reused.
+    It depends only on deployed files, so every worker agrees on it and a
+    conditional request gets its 304 whichever worker serves it.
+    """
+    digest = hashlib.blake2b(digest_size=4)
+    template_dir = os.path.join(app.root_path, app.template_folder or 'templates')
+    for path in (__file__,
+                 os.path.join(template_dir, 'base.html'),
+                 os.path.join(template_dir, 'index.html')):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+_INDEX_ETAG_SALT = _index_etag_salt()
 
+# Book lists keyed by (user_id, sort, books version), shared by the pages
+# and the API. As with the /api/books cache below, a write bumps the version,
+# so stale lists are never hit again and fall out of the LRU. Callers must
+# treat the returned lists as read-only.
+BOOKS_CACHE_SIZE = 256
+_books_cache: _LRUCache[Tuple[Optional[int], str, str], List[Dict]] = _LRUCache(BOOKS_CACHE_SIZE)
 
-def allowed_file(filename):
-    """Check if file extension is allowed."""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def _get_all_books_cached(user_id: Optional[int], sort_by: str = 'recent',
+                          version: Optional[str] = None) -> List[Dict]:
+    """
+    Get all books visible to a user, reusing the last query while nothing has changed.
+    
+    Args:
+        user_id: User ID to filter books, or None for all books
+        sort_by: Sort order passed to get_all_books
+        version: The books version if the caller already has it
+        
+    Returns:
+        List of book dictionaries (shared; do not modify)
+    """
+    if version is None:
+        version = db.get_books_version(user_id)
+    key = (user_id, sort_by, version)
+    books = _books_cache.get(key)
+    if books is None:
+        books = db.get_all_books(user_id=user_id, sort_by=sort_by)
+        _books_cache.put(key, books)
+    return books
 
 
 @app.route('/')
@@ -225,12 +464,28 @@ def index():
     # Validate sort parameter
     if sort_by not in ['recent', 'title', 'author']:
         sort_by = 'recent'
-    books = db.get_all_books(user_id=user_id, sort_by=sort_by)
-    return render_template('index.html', books=books, ai_available=ai_service is not None, current_sort=sort_by)
+    
+    # Skip the query and render when the browser's copy is still current.
+    # Pending flash messages are shown by the page, so always render then.
+    version = db.get_books_version(user_id)
+    etag = f'{_INDEX_ETAG_SALT}-{user_id}-{sort_by}-{version}'
+    if '_flashes' not in session and request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        books = _get_all_books_cached(user_id, sort_by, version)
+        response = make_response(render_template(
+            'index.html', books=books, ai_available=ai_service is not None, current_sort=sort_by
+        ))
+    response.set_etag(etag, weak=True)
+    # Let the browser keep the page but check back every time
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 
 @app.route('/login', methods=['GET', 'POST'])
-@limiter.limit(rate_limit_config['login_attempts'])
+@limiter.exempt
+@strict_limiter.limit(rate_limit_config['login_attempts'])
 def login():
     """User login page with rate limiting."""
     if current_user.is_authenticated:
@@ -287,24 +542,69 @@ def logout():
     return redirect(url_for('index'))
 
 
-def check_ai_rate_limit(session_id: str) -> bool:
+def _ai_rate_limit_client() -> str:
+    """
+    Rate-limit identity for the current AI request.
+    
+    AI routes require login, so the account is used rather than the client
+    IP: users behind one NAT or proxy no longer share a bucket, and clearing
+    cookies does not reset it. strict_limiter still applies its per-IP limit.
+    """
+    return f'user:{current_user.id}'
+
+
+def _ai_rate_limit_key(session_id: str) -> bytes:
+    """Fixed 8-byte bucket key for a session, whatever the length of its IP string."""
+    return hashlib.blake2b(session_id.encode(), digest_size=8).digest()
+
+
+def check_ai_rate_limit(session_id: str) -> Tuple[bool, int]:
     """
-    Check if AI rate limit allows request.
+    Take one AI request from the session's token bucket.
     
     Args:
         session_id: Session identifier for rate limiting
         
     Returns:
-        True if request is allowed, False if rate limited
+        (allowed, retry_after): whether the request may go ahead, and if not,
+        roughly how many seconds until it would be allowed
     """
-    current_time = time.time()
-    last_request = ai_rate_limit.get(session_id, 0)
-    
-    if current_time - last_request < AI_RATE_LIMIT_SECONDS:
-        return False
+    key = _ai_rate_limit_key(session_id)
+    if ai_rate_limit_script is not None:
+        try:
+            allowed, retry_after = ai_rate_limit_script(
+                keys=[b'ai_rate_limit:tb:' + key],
+                args=[AI_RATE_LIMIT_BURST, AI_RATE_LIMIT_SECONDS]
+            )
+            return bool(allowed), int(retry_after)
+        except Exception as e:
+            logger.warning("Redis AI rate limit check failed, using in-memory storage: %s", e)
     
-    ai_rate_limit[session_id] = current_time
-    return True
+    # Threaded workers share the cache; the read, refill, write and eviction
+    # must happen as one step or two requests can spend the same token
+    with ai_rate_limit.lock:
+        current_time = time.monotonic()
+        tokens, updated = ai_rate_limit.get(key) or (AI_RATE_LIMIT_BURST, current_time)
+        tokens = min(AI_RATE_LIMIT_BURST, tokens + (current_time - updated) / AI_RATE_LIMIT_SECONDS)
+        
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+            retry_after = 0
+        else:
+            retry_after = math.ceil((1 - tokens) * AI_RATE_LIMIT_SECONDS)
+        
+        ai_rate_limit.put(key, (tokens, current_time))
+        
+        # Buckets idle long enough to refill completely are the same as no entry;
+        # they sit at the front, so this stops at the first live one
+        full_after = AI_RATE_LIMIT_BURST * AI_RATE_LIMIT_SECONDS
+        while True:
+            oldest = ai_rate_limit.oldest()
+            if oldest is None or current_time - oldest[1][1] < full_after:
+                break
+            ai_rate_limit.pop(oldest[0])
+    return allowed, retry_after
 
 
 @app.route('/add', methods=['GET', 'POST'])
@@ -367,91 +667,61 @@ def add_from_file():
             flash(f'Invalid filename: {str(e)}', 'error')
             return redirect(url_for('add_from_file'))
         
-        if file and allowed_file(file.filename):
-            # Read and validate file content before saving
-            try:
-                file_content = file.read()
-                
-                # Validate file size
-                validate_file_size(len(file_content))
-                
-                # Validate file content
-                validate_file_content(file_content)
-                
-            except ValidationError as e:
-                logger.warning(f"Invalid file content: {e}")
-                flash(f'Invalid file: {str(e)}', 'error')
-                return redirect(url_for('add_from_file'))
+        # validate_filename has already checked the extension
+        # Read and validate file content before parsing
+        try:
+            file_content = file.read()
             
-            # Save to secure location
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            # Validate file size
+            validate_file_size(len(file_content))
             
-            # Validate file path (prevent path traversal)
-            try:
-                validated_filepath = validate_file_path(filepath, base_dir=app.config['UPLOAD_FOLDER'])
-            except ValidationError as e:
-                logger.error(f"Path traversal attempt: {filepath} - {e}")
-                flash('Invalid file path.', 'error')
-                return redirect(url_for('add_from_file'))
+            # Validate file content
+            validate_file_content(file_content)
             
-            # Write validated content to file
-            with open(validated_filepath, 'wb') as f:
-                f.write(file_content)
+        except ValidationError as e:
+            logger.warning(f"Invalid file content: {e}")
+            flash(f'Invalid file: {str(e)}', 'error')
+            return redirect(url_for('add_from_file'))
+        
+        # Parse straight from memory; the upload never touches the disk
+        try:
+            books = parse_book_content(file_content.decode('utf-8'), validated_filename)
             
-            try:
-                books = parse_book_file(validated_filepath)
-                
-                if not books:
-                    flash('No books found in file.', 'warning')
-                    return redirect(url_for('index'))
-                
-                added_count = 0
-                validation_errors = 0
-                
-                # Rate limiting for file uploads
-                session_id = request.remote_addr or 'unknown'
-                
-                for title, author in books:
-                    if not author:
-                        # Skip books without authors for now
-                        continue
-                    
-                    # Validate each book's data
-                    try:
-                        validated_title, validated_author, _ = validate_all_book_data(title, author, None)
-                    except ValidationError as e:
-                        logger.warning(f"Skipping invalid book from file: {title} - {e}")
-                        validation_errors += 1
-                        continue
-                    
-                    try:
-                        book_id = db.add_book(validated_title, validated_author, user_id=current_user.id)
-                        if book_id != -1:
-                            added_count += 1
-                            # Summaries can be generated later by the user
-                    except ValidationError as e:
-                        logger.warning(f"Failed to add book from file: {validated_title} - {e}")
-                        validation_errors += 1
-                        continue
+            if not books:
+                flash('No books found in file.', 'warning')
+                return redirect(url_for('index'))
+            
+            validated_books = []
+            validation_errors = 0
+            
+            for title, author in books:
+                if not author:
+                    # Skip books without authors for now
+                    continue
                 
-                if validation_errors > 0:
-                    flash(f'Successfully added {added_count} book(s) from file. Skipped {validation_errors} invalid entries.', 'warning')
-                else:
-                    flash(f'Successfully added {added_count} book(s) from file.', 'success')
+                # Validate each book's data
+                try:
+                    validated_title, validated_author, _ = validate_all_book_data(title, author, None)
+                except ValidationError as e:
+                    logger.warning(f"Skipping invalid book from file: {title} - {e}")
+                    validation_errors += 1
+                    continue
                 
-            except Exception as e:
-                logger.error(f"Error processing file: {e}")
-                flash(f'Error processing file: {str(e)}', 'error')
-            finally:
-                # Clean up uploaded file
-                if os.path.exists(validated_filepath):
-                    os.remove(validated_filepath)
+                validated_books.append((validated_title, validated_author))
             
-            return redirect(url_for('index'))
-        else:
-            flash('Invalid file type. Only .txt files are allowed.', 'error')
-            return redirect(url_for('add_from_file'))
+            # One transaction for the whole file; summaries can be generated later
+            added_count = db.add_books_bulk(validated_books, user_id=current_user.id)
+            
+            if validation_errors > 0:
+                flash(f'Successfully added {added_count} book(s) from file. Skipped {validation_errors} invalid entries.', 'warning')
+            else:
+                flash(f'Successfully added {added_count} book(s) from file.', 'success')
+            
+        except Exception as e:
+            logger.error(f"Error processing file: {e}")
+            flash(f'Error processing file: {str(e)}', 'error')
+        
+        return redirect(url_for('index'))
     
     return render_template('add_from_file.html')
 
@@ -479,7 +749,8 @@ def view_book(book_id):
 
 @app.route('/generate-summaries', methods=['GET', 'POST'])
 @login_required
-@limiter.limit(rate_limit_config['ai_summary'])
+@limiter.exempt
+@strict_limiter.limit(rate_limit_config['ai_summary'])
 def generate_summaries():
     """Generate summaries for selected books with rate limiting."""
     if request.method == 'POST':
@@ -502,14 +773,17 @@ def generate_summaries():
             return redirect(url_for('generate_summaries'))
         
         # Rate limiting
-        session_id = request.remote_addr or 'unknown'
+        session_id = _ai_rate_limit_client()
         
         success_count = 0
         skipped_count = 0
         error_count = 0
         
+        # One query for every selected book instead of one per iteration
+        books_by_id = db.get_books_by_ids(validated_ids, user_id=current_user.id)
+        
         for book_id in validated_ids:
-            book = db.get_book(book_id, user_id=current_user.id)
+            book = books_by_id.get(book_id)
             if not book:
                 error_count += 1
                 continue
@@ -520,13 +794,15 @@ def generate_summaries():
                 continue
             
             # Check rate limit
-            if not check_ai_rate_limit(session_id):
-                flash(f'Rate limit reached. Generated {success_count} summaries. Please wait before generating more.', 'warning')
+            allowed, retry_after = check_ai_rate_limit(session_id)
+            if not allowed:
+                flash(f'Rate limit reached. Generated {success_count} summaries. Please wait {retry_after} seconds before generating more.', 'warning')
                 break
             
             try:
                 summary = ai_service.generate_summary(book['title'], book['author'])
                 db.update_summary(book_id, summary, user_id=current_user.id)
+                book['summary'] = summary  # A repeated ID is then skipped, as before
                 success_count += 1
             except Exception as e:
                 logger.error(f"Failed to generate summary for book {book_id}: {e}")
@@ -551,9 +827,7 @@ def generate_summaries():
         return redirect(url_for('index'))
     
     # GET request - show form
-    books = db.get_all_books(user_id=current_user.id)
-    # Filter to books without summaries
-    books_without_summaries = [book for book in books if not book.get('summary')]
+    books_without_summaries = db.get_books_without_summary(user_id=current_user.id)
     
     return render_template('generate_summaries.html', 
                          books=books_without_summaries, 
@@ -562,7 +836,8 @@ def generate_summaries():
 
 @app.route('/book/<int:book_id>/edit-summary', methods=['GET', 'POST'])
 @login_required
-@limiter.limit(rate_limit_config['ai_summary'])
+@limiter.exempt
+@strict_limiter.limit(rate_limit_config['ai_summary'])
 def edit_summary(book_id):
     """Edit summary for a specific book with rate limiting on regeneration."""
     try:
@@ -585,7 +860,6 @@ def edit_summary(book_id):
             new_summary = request.form.get('summary', '').strip()
             
             try:
-                from validation import validate_summary
                 validated_summary = validate_summary(new_summary) if new_summary else None
                 db.update_summary(validated_id, validated_summary, user_id=current_user.id)
                 flash(f'Summary updated for "{book["title"]}".', 'success')
@@ -603,9 +877,10 @@ def edit_summary(book_id):
                 return redirect(url_for('edit_summary', book_id=validated_id))
             
             # Rate limiting
-            session_id = request.remote_addr or 'unknown'
-            if not check_ai_rate_limit(session_id):
-                flash('Rate limit reached. Please wait before regenerating.', 'warning')
+            session_id = _ai_rate_limit_client()
+            allowed, retry_after = check_ai_rate_limit(session_id)
+            if not allowed:
+                flash(f'Rate limit reached. Please wait {retry_after} seconds before regenerating.', 'warning')
                 return redirect(url_for('edit_summary', book_id=validated_id))
             
             try:
@@ -623,7 +898,8 @@ def edit_summary(book_id):
 
 @app.route('/book/<int:book_id>/generate-summary', methods=['POST'])
 @login_required
-@limiter.limit(rate_limit_config['ai_summary'])
+@limiter.exempt
+@strict_limiter.limit(rate_limit_config['ai_summary'])
 def generate_single_summary(book_id):
     """Generate summary for a single book with rate limiting."""
     try:
@@ -648,9 +924,10 @@ def generate_single_summary(book_id):
         return redirect(url_for('view_book', book_id=validated_id))
     
     # Rate limiting
-    session_id = request.remote_addr or 'unknown'
-    if not check_ai_rate_limit(session_id):
-        flash('Rate limit reached. Please wait before generating.', 'warning')
+    session_id = _ai_rate_limit_client()
+    allowed, retry_after = check_ai_rate_limit(session_id)
+    if not allowed:
+        flash(f'Rate limit reached. Please wait {retry_after} seconds before generating.', 'warning')
         return redirect(url_for('view_book', book_id=validated_id))
     
     try:
@@ -668,7 +945,7 @@ def generate_single_summary(book_id):
 @login_required
 def flashcards():
     """Flashcard mode."""
-    books = db.get_all_books(user_id=current_user.id)
+    books = _get_all_books_cached(current_user.id)
     if not books:
         flash('No books available for flashcard mode. Add some books first!', 'info')
         return redirect(url_for('index'))
@@ -676,13 +953,36 @@ def flashcards():
     return render_template('flashcards.html', books=books)
 
 
+def _content_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+# Serialized /api/books bodies and their ETags keyed by (user_id, books version). Any write
+# bumps the version, so stale entries are simply never hit again and fall
+# out of the LRU; nothing has to be invalidated.
+API_BOOKS_CACHE_SIZE = 256
+_api_books_cache: _LRUCache[Tuple[int, str], Tuple[bytes, str]] = _LRUCache(API_BOOKS_CACHE_SIZE)
+
+
 @app.route('/api/books')
 @login_required
 @limiter.limit(rate_limit_config['api_endpoints'])
 def api_books():
     """API endpoint to get all books with rate limiting."""
-    books = db.get_all_books(user_id=current_user.id)
-    return jsonify(books)
+    version = db.get_books_version(current_user.id)
+    key = (current_user.id, version)
+    cached = _api_books_cache.get(key)
+    if cached is None:
+        books = _get_all_books_cached(current_user.id, version=version)
+        body = _json_response(books).get_data()
+        cached = (body, _content_etag(body))
+        _api_books_cache.put(key, cached)
+    
+    body, etag = cached
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 
 @app.route('/api/book/<int:book_id>')
@@ -696,11 +996,13 @@ def api_book(book_id):
         book = db.get_book(validated_id, user_id=current_user.id)
     except ValidationError as e:
         logger.warning(f"Invalid book_id in api_book: {book_id} - {e}")
-        return jsonify({'error': 'Invalid book ID'}), 400
+        return _json_response({'error': 'Invalid book ID'}), 400
     
     if not book:
-        return jsonify({'error': 'Book not found'}), 404
-    return jsonify(book)
+        return _json_response({'error': 'Book not found'}), 404
+    response = _json_response(book)
+    response.set_etag(_content_etag(response.get_data()))
+    return response.make_conditional(request)
 
 
 @app.route('/admin/rate-limits')
@@ -720,10 +1022,10 @@ def admin_rate_limits():
             'rate_limits': rate_limit_config,
             'current_ip': get_remote_address(),
         }
-        return jsonify(stats)
+        return _json_response(stats)
     except Exception as e:
         logger.error("Error fetching rate limit stats: %s", e)
-        return jsonify({'error': 'Failed to fetch rate limit stats'}), 500
+        return _json_response({'error': 'Failed to fetch rate limit stats'}), 500
 
 
 @app.route('/admin/rate-limits/reset', methods=['POST'])
@@ -732,22 +1034,23 @@ def admin_reset_rate_limits():
     """Admin endpoint to reset rate limits."""
     # Check if user is admin
     if not current_user.email.endswith('@admin.local'):
-        return jsonify({'error': 'Access denied'}), 403
+        return _json_response({'error': 'Access denied'}), 403
     
     try:
         # Reset rate limits by clearing storage
         limiter.reset()
+        strict_limiter.reset()
         logger.info("Rate limits reset by admin user: %s", current_user.email)
-        return jsonify({'success': True, 'message': 'Rate limits reset successfully'})
+        return _json_response({'success': True, 'message': 'Rate limits reset successfully'})
     except Exception as e:
         logger.error("Error resetting rate limits: %s", e)
-        return jsonify({'error': 'Failed to reset rate limits'}), 500
+        return _json_response({'error': 'Failed to reset rate limits'}), 500
 
 
 @app.route('/health')
 def health():
     """Health check endpoint for Render.com."""
-    return jsonify({'status': 'healthy', 'ai_service': ai_service is not None})
+    return _json_response({'status': 'healthy', 'ai_service': ai_service is not None})
 
 
 if __name__ == '__main__':